@@ -0,0 +1,154 @@
+"""Bitmap-backed active-account sets for fast distinct counts across filters.
+
+Every account gets a dense integer position. Each month's active accounts and
+each month's segment/region/channel values are stored as packed uint64 bitsets
+over those positions, so distinct active, retained and churned counts for any
+filter combination are a few bitwise ANDs plus a popcount. Attribute bitsets
+follow the dim_account_history version in force at the end of each month, the
+same as-of rule the MRR queries use, so filtered account counts and MRR cover
+the same accounts.
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+FILTER_COLUMNS = {
+    'segment': 'segment',
+    'region': 'region',
+    'channel': 'acquisition_channel',
+}
+
+# Popcount lookup for one byte; numpy<2 has no bitwise_count
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def _popcount(words):
+    return int(_POPCOUNT[words.view(np.uint8)].sum(dtype=np.int64))
+
+
+def _to_bitset(positions, num_words):
+    """Pack account positions into a uint64 bitset."""
+    bits = np.zeros(num_words * 64, dtype=bool)
+    bits[positions] = True
+    return np.packbits(bits, bitorder='little').view(np.uint64)
+
+
+class AccountBitmapIndex:
+    """Per-month active-account bitsets with per-month, per-attribute filter bitsets."""
+
+    def __init__(self, account_ids, months, month_bitsets, attribute_bitsets):
+        self.account_ids = account_ids
+        self.months = months
+        self.num_words = (len(account_ids) + 63) // 64
+        self._month_bitsets = month_bitsets
+        self._attribute_bitsets = attribute_bitsets
+        self._all = _to_bitset(np.arange(len(account_ids)), self.num_words)
+
+    @classmethod
+    def from_frames(cls, accounts_df, activity_df, history_df):
+        """Build the index from dim_account rows, (account_id, month) activity rows and dim_account_history versions."""
+        account_ids = accounts_df['account_id'].to_numpy()
+        position = pd.Index(account_ids)
+        num_words = (len(account_ids) + 63) // 64
+
+        activity_df = activity_df.assign(position=position.get_indexer(activity_df['account_id']))
+        activity_df = activity_df[activity_df['position'] >= 0]
+
+        month_bitsets = {}
+        for month, group in activity_df.groupby('month'):
+            month_bitsets[pd.Timestamp(month)] = _to_bitset(group['position'].to_numpy(), num_words)
+        months = sorted(month_bitsets)
+
+        history_df = history_df.assign(position=position.get_indexer(history_df['account_id']))
+        history_df = history_df[history_df['position'] >= 0]
+        valid_from = pd.to_datetime(history_df['valid_from'])
+        valid_to = pd.to_datetime(history_df['valid_to']).fillna(pd.Timestamp.max)
+
+        attribute_bitsets = {}
+        for month in months:
+            as_of = month + pd.DateOffset(months=1) - pd.Timedelta(microseconds=1)
+            versions = history_df[(valid_from <= as_of) & (valid_to > as_of)]
+            for filter_name, column in FILTER_COLUMNS.items():
+                for value, group in versions.groupby(column):
+                    attribute_bitsets[(filter_name, value, month)] = _to_bitset(group['position'].to_numpy(), num_words)
+
+        return cls(account_ids, months, month_bitsets, attribute_bitsets)
+
+    @classmethod
+    def load(cls, path):
+        """Load an index previously written with save()."""
+        with np.load(path, allow_pickle=True) as data:
+            months = [pd.Timestamp(str(m)) for m in data['months']]
+            month_bitsets = dict(zip(months, data['month_bitsets']))
+            attribute_bitsets = dict(zip(
+                [(filter_name, value, pd.Timestamp(str(month))) for filter_name, value, month in data['attribute_keys']],
+                data['attribute_bitsets']
+            ))
+            return cls(data['account_ids'], months, month_bitsets, attribute_bitsets)
+
+    def save(self, path):
+        """Persist the index as a compressed .npz file."""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        empty = np.zeros((0, self.num_words), dtype=np.uint64)
+        np.savez_compressed(
+            path,
+            account_ids=self.account_ids,
+            months=np.array([m.isoformat() for m in self.months]),
+            month_bitsets=np.stack([self._month_bitsets[m] for m in self.months]) if self.months else empty,
+            attribute_keys=np.array(
+                [(filter_name, value, month.isoformat()) for filter_name, value, month in self._attribute_bitsets],
+                dtype=object,
+            ),
+            attribute_bitsets=np.stack(list(self._attribute_bitsets.values())) if self._attribute_bitsets else empty,
+        )
+
+    def _filter_mask(self, month, segment=None, region=None, channel=None):
+        """Accounts whose attributes at the end of the month match the filters."""
+        mask = self._all
+        for filter_name, value in (('segment', segment), ('region', region), ('channel', channel)):
+            if value is None or value == 'All':
+                continue
+            bitset = self._attribute_bitsets.get((filter_name, value, pd.Timestamp(month)))
+            if bitset is None:
+                return np.zeros(self.num_words, dtype=np.uint64)
+            mask = mask & bitset
+        return mask
+
+    def _month(self, month):
+        bitset = self._month_bitsets.get(pd.Timestamp(month))
+        if bitset is None:
+            return np.zeros(self.num_words, dtype=np.uint64)
+        return bitset
+
+    def _previous_month(self, month):
+        return pd.Timestamp(month) - pd.DateOffset(months=1)
+
+    def active_count(self, month, segment=None, region=None, channel=None):
+        """Distinct accounts active in the month."""
+        return _popcount(self._month(month) & self._filter_mask(month, segment, region, channel))
+
+    def retained_count(self, month, segment=None, region=None, channel=None):
+        """Accounts active in both the prior month and this month."""
+        mask = self._filter_mask(month, segment, region, channel)
+        return _popcount(self._month(month) & self._month(self._previous_month(month)) & mask)
+
+    def churned_count(self, month, segment=None, region=None, channel=None):
+        """Accounts active in the prior month but not in this month."""
+        mask = self._filter_mask(month, segment, region, channel)
+        return _popcount(self._month(self._previous_month(month)) & ~self._month(month) & mask)
+
+    def monthly_counts(self, segment=None, region=None, channel=None):
+        """Active, retained and churned counts for every indexed month."""
+        rows = []
+        for month in self.months:
+            mask = self._filter_mask(month, segment, region, channel)
+            current = self._month(month) & mask
+            previous = self._month(self._previous_month(month)) & mask
+            rows.append({
+                'month': month,
+                'active_accounts': _popcount(current),
+                'retained_accounts': _popcount(current & previous),
+                'churned_accounts': _popcount(previous & ~current),
+            })
+        return pd.DataFrame(rows)
@@ -0,0 +1,148 @@
+"""Plotly figure builders shared by the dashboard and the snapshot renderer."""
+import plotly.express as px
+import plotly.graph_objects as go
+
+
+def mrr_trend(mrr_trend_df):
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=mrr_trend_df['revenue_month'], y=mrr_trend_df['total_mrr'],
+                            mode='lines+markers', name='Total MRR', line=dict(width=3)))
+    fig.add_trace(go.Scatter(x=mrr_trend_df['revenue_month'], y=mrr_trend_df['new_mrr'],
+                            mode='lines', name='New MRR', line=dict(dash='dot')))
+    fig.add_trace(go.Scatter(x=mrr_trend_df['revenue_month'], y=mrr_trend_df['expansion_mrr'],
+                            mode='lines', name='Expansion', line=dict(dash='dot')))
+    fig.update_layout(height=400, hovermode='x unified')
+    return fig
+
+
+def revenue_by_segment(segment_rev_df):
+    fig = px.pie(segment_rev_df, values='total_mrr', names='segment', hole=0.4)
+    fig.update_layout(height=400)
+    return fig
+
+
+def win_rate_by_segment(pipeline_df):
+    fig = px.bar(pipeline_df, x='segment', y='win_rate', text='win_rate',
+                labels={'win_rate': 'Win Rate', 'segment': 'Segment'})
+    fig.update_traces(texttemplate='%{text:.1%}', textposition='outside')
+    fig.update_layout(height=400)
+    return fig
+
+
+def sales_cycle(sales_cycle_df):
+    fig = px.bar(sales_cycle_df, x='segment', y='avg_sales_cycle_days',
+                labels={'avg_sales_cycle_days': 'Avg Days', 'segment': 'Segment'},
+                color='avg_sales_cycle_days', color_continuous_scale='Blues')
+    fig.update_layout(height=400, showlegend=False)
+    return fig
+
+
+def deal_value(deal_value_df):
+    fig = px.bar(deal_value_df, x='segment', y='avg_deal_value', color='stage',
+                barmode='group', text='deal_count',
+                labels={'avg_deal_value': 'Avg Deal Value', 'deal_count': 'Count'})
+    fig.update_layout(height=400)
+    return fig
+
+
+def retention_heatmap(cohort_matrix_df):
+    # Each row already holds one cohort's retention curve, months 0..N
+    retention_z = [list(row) for row in cohort_matrix_df['retention_pct_by_age']]
+    max_age = len(retention_z[0]) if retention_z else 0
+
+    fig = go.Figure(data=go.Heatmap(
+        z=retention_z,
+        x=list(range(max_age)),
+        y=cohort_matrix_df['cohort_month'],
+        colorscale='RdYlGn',
+        text=retention_z,
+        texttemplate='%{text:.0f}%',
+        textfont={"size": 10},
+        colorbar=dict(title="Retention %")
+    ))
+    fig.update_layout(
+        xaxis_title="Months Since Cohort",
+        yaxis_title="Cohort Month",
+        height=500
+    )
+    return fig
+
+
+def account_flow(account_flow_df):
+    fig = go.Figure()
+    fig.add_trace(go.Bar(x=account_flow_df['month'], y=account_flow_df['retained_accounts'], name='Retained'))
+    fig.add_trace(go.Bar(x=account_flow_df['month'], y=-account_flow_df['churned_accounts'], name='Churned'))
+    fig.add_trace(go.Scatter(x=account_flow_df['month'], y=account_flow_df['active_accounts'],
+                            mode='lines+markers', name='Active', line=dict(width=3)))
+    fig.update_layout(height=400, barmode='relative', hovermode='x unified')
+    return fig
+
+
+def activation_retention(activation_retention_df):
+    fig = px.scatter(activation_retention_df, x='avg_activation', y='avg_retention',
+                    size=[100]*len(activation_retention_df), text='segment',
+                    labels={'avg_activation': 'Activation Rate', 'avg_retention': '6-Month Retention'})
+    fig.update_traces(textposition='top center')
+    fig.update_layout(height=400)
+    return fig
+
+
+def churn_by_cohort(churn_trend_df):
+    fig = px.line(churn_trend_df, x='cohort_month', y='avg_churn_rate',
+                 markers=True, labels={'avg_churn_rate': 'Avg Churn Rate (3-6mo)'})
+    fig.update_layout(height=400)
+    return fig
+
+
+def tickets_by_segment(tickets_by_segment_df):
+    fig = px.bar(tickets_by_segment_df, x='segment', y=['critical', 'high', 'tickets'],
+                barmode='group', labels={'value': 'Ticket Count', 'variable': 'Severity'})
+    fig.update_layout(height=400)
+    return fig
+
+
+def sla_by_region(sla_by_region_df):
+    fig = px.bar(sla_by_region_df, x='region', y='breach_rate',
+                labels={'breach_rate': 'SLA Breach Rate', 'region': 'Region'},
+                color='breach_rate', color_continuous_scale='Reds')
+    fig.update_layout(height=400)
+    return fig
+
+
+def anomaly_distribution(anomalies_df):
+    anomaly_counts = anomalies_df['anomaly_type'].value_counts()
+    fig = px.pie(values=anomaly_counts.values, names=anomaly_counts.index,
+                color=anomaly_counts.index,
+                color_discrete_map={'Spike': '#28a745', 'Drop': '#dc3545'})
+    fig.update_layout(height=300)
+    return fig
+
+
+def metric_trend(metric_trend_df, metric_name):
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=metric_trend_df['metric_month'], y=metric_trend_df['metric_value'],
+                            mode='lines+markers', name=metric_name, line=dict(width=2)))
+    fig.update_layout(height=400, hovermode='x unified',
+                     yaxis_title=metric_name, xaxis_title='Month')
+    return fig
+
+
+def forecast_fan(scenario_bands, baseline_bands, scale=1):
+    """Scenario percentile bands with the baseline median overlaid; scale=12 for ARR."""
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=scenario_bands.index, y=scenario_bands['p95'] * scale,
+                            mode='lines', line=dict(width=0), showlegend=False))
+    fig.add_trace(go.Scatter(x=scenario_bands.index, y=scenario_bands['p5'] * scale,
+                            mode='lines', line=dict(width=0), fill='tonexty',
+                            fillcolor='rgba(31, 119, 180, 0.15)', name='Scenario 5-95%'))
+    fig.add_trace(go.Scatter(x=scenario_bands.index, y=scenario_bands['p75'] * scale,
+                            mode='lines', line=dict(width=0), showlegend=False))
+    fig.add_trace(go.Scatter(x=scenario_bands.index, y=scenario_bands['p25'] * scale,
+                            mode='lines', line=dict(width=0), fill='tonexty',
+                            fillcolor='rgba(31, 119, 180, 0.35)', name='Scenario 25-75%'))
+    fig.add_trace(go.Scatter(x=scenario_bands.index, y=scenario_bands['p50'] * scale,
+                            mode='lines+markers', name='Scenario median', line=dict(width=3)))
+    fig.add_trace(go.Scatter(x=baseline_bands.index, y=baseline_bands['p50'] * scale,
+                            mode='lines', name='Baseline median', line=dict(dash='dot', color='gray')))
+    fig.update_layout(height=400, hovermode='x unified')
+    return fig
@@ -0,0 +1,206 @@
+"""Headless HTTP API over the named dashboard queries.
+
+Serves every query in queries.API_QUERIES as JSON or Arrow IPC with the same
+segment/region/channel filters as the dashboard, for any tenant in
+tenants.json (?tenant=<id>). Responses are cached in memory and carry an
+ETag derived from the dbt runs that last rebuilt the models the query reads
+(mart_model_builds), so clients revalidate for free until one of those marts
+is rebuilt. Until every model a query reads has been recorded, responses are
+neither cached nor tagged.
+"""
+import argparse
+import asyncio
+import datetime
+import decimal
+import hashlib
+import json
+import os
+import sys
+from collections import OrderedDict
+from pathlib import Path
+
+import asyncpg
+import pyarrow as pa
+from aiohttp import web
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from tenants import DEFAULT_TENANT, load_tenants
+
+from queries import API_QUERIES, BIND_PATTERN, FILTER_COLUMNS, normalize_filters, query_models, query_params, render
+
+BUILD_POLL_SECONDS = 5
+CACHE_SIZE = 2048
+
+JSON_TYPE = 'application/json'
+ARROW_TYPE = 'application/vnd.apache.arrow.stream'
+
+
+def to_asyncpg(sql, params):
+    """Rewrite :name bind parameters as asyncpg's positional $n placeholders."""
+    names = []
+
+    def placeholder(match):
+        name = match.group(1)
+        if name not in names:
+            names.append(name)
+        return f'${names.index(name) + 1}'
+
+    return BIND_PATTERN.sub(placeholder, sql), [params[name] for name in names]
+
+
+def _json_default(value):
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    raise TypeError(f"Unserializable value: {value!r}")
+
+
+def encode_json(rows):
+    return json.dumps([dict(row) for row in rows], default=_json_default).encode()
+
+
+def encode_arrow(rows):
+    table = pa.Table.from_pylist([dict(row) for row in rows])
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def tenant_pool(app, tenant):
+    return app['pools'][app['tenants'][tenant]['database_url']]
+
+
+async def fetch(app, tenant, name, filters=None, **params):
+    sql, args = to_asyncpg(*render(name, filters, app['tenants'][tenant]['schema'], **params))
+    async with tenant_pool(app, tenant).acquire() as conn:
+        return await conn.fetch(sql, *args)
+
+
+async def poll_model_builds(app):
+    """Track which dbt run last rebuilt each of a tenant's models, so cached responses expire with their marts."""
+    while True:
+        for tenant in app['tenants']:
+            try:
+                rows = await fetch(app, tenant, 'model_builds')
+                app['model_builds'][tenant] = {row['model_name']: row['invocation_id'] for row in rows}
+            except (asyncpg.PostgresError, OSError) as e:
+                app['model_builds'][tenant] = {}
+                print(f"⚠️  Could not read model builds for {tenant}: {e}")
+        await asyncio.sleep(BUILD_POLL_SECONDS)
+
+
+def data_version(app, tenant, name):
+    """(model, invocation_id) for every model the query reads, or None if any build is unknown."""
+    builds = app['model_builds'][tenant]
+    models = query_models(name)
+    if not all(model in builds for model in models):
+        return None
+    return tuple((model, builds[model]) for model in models)
+
+
+async def on_startup(app):
+    app['tenants'] = load_tenants()
+    # One pool per shard; tenants on the same Postgres instance share connections
+    app['pools'] = {}
+    for config in app['tenants'].values():
+        if config['database_url'] not in app['pools']:
+            app['pools'][config['database_url']] = await asyncpg.create_pool(
+                config['database_url'], min_size=0, max_size=10
+            )
+    app['model_builds'] = {tenant: {} for tenant in app['tenants']}
+    app['cache'] = OrderedDict()
+    app['build_poller'] = asyncio.create_task(poll_model_builds(app))
+
+
+async def on_cleanup(app):
+    app['build_poller'].cancel()
+    for pool in app['pools'].values():
+        await pool.close()
+
+
+async def list_metrics(request):
+    metrics = [
+        {'name': name, 'filters': list(FILTER_COLUMNS), 'params': query_params(name)}
+        for name in API_QUERIES
+    ]
+    return web.json_response({'tenants': list(request.app['tenants']), 'metrics': metrics})
+
+
+async def health(request):
+    return web.json_response({'status': 'ok', 'model_builds': request.app['model_builds']})
+
+
+async def get_metric(request):
+    name = request.match_info['name']
+    if name not in API_QUERIES:
+        raise web.HTTPNotFound(text=f"Unknown metric: {name}")
+
+    app = request.app
+    query = dict(request.query)
+    tenant = query.pop('tenant', DEFAULT_TENANT)
+    if tenant not in app['tenants']:
+        raise web.HTTPNotFound(text=f"Unknown tenant: {tenant}")
+    wants_arrow = query.pop('format', None) == 'arrow' or ARROW_TYPE in request.headers.get('Accept', '')
+    filters = normalize_filters({key: query.pop(key, None) for key in FILTER_COLUMNS})
+
+    extra = query_params(name)
+    unknown = set(query) - set(extra)
+    missing = set(extra) - set(query)
+    if unknown or missing:
+        raise web.HTTPBadRequest(text=f"Unknown params: {sorted(unknown)}; missing params: {sorted(missing)}")
+
+    content_type = ARROW_TYPE if wants_arrow else JSON_TYPE
+    version = data_version(app, tenant, name)
+    if version is None:
+        rows = await fetch(app, tenant, name, filters, **query)
+        body = encode_arrow(rows) if wants_arrow else encode_json(rows)
+        return web.Response(body=body, content_type=content_type,
+                            headers={'Cache-Control': 'no-store', 'Vary': 'Accept'})
+
+    cache_key = (
+        tenant, version, name,
+        tuple(sorted(filters.items())), tuple(sorted(query.items())), content_type,
+    )
+    etag = '"' + hashlib.sha1(repr(cache_key).encode()).hexdigest() + '"'
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache', 'Vary': 'Accept'}
+
+    if request.headers.get('If-None-Match') == etag:
+        return web.Response(status=304, headers=headers)
+
+    cache = app['cache']
+    body = cache.get(cache_key)
+    if body is None:
+        rows = await fetch(app, tenant, name, filters, **query)
+        body = encode_arrow(rows) if wants_arrow else encode_json(rows)
+        cache[cache_key] = body
+        if len(cache) > CACHE_SIZE:
+            cache.popitem(last=False)
+    else:
+        cache.move_to_end(cache_key)
+
+    return web.Response(body=body, content_type=content_type, headers=headers)
+
+
+def create_app():
+    app = web.Application()
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    app.router.add_get('/health', health)
+    app.router.add_get('/metrics', list_metrics)
+    app.router.add_get('/metrics/{name}', get_metric)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve dashboard metrics as JSON/Arrow')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=int(os.getenv('METRICS_API_PORT', '8000')))
+    args = parser.parse_args()
+
+    web.run_app(create_app(), host=args.host, port=args.port, access_log=None)
+
+
+if __name__ == '__main__':
+    main()
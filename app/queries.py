@@ -0,0 +1,395 @@
+"""Named dashboard queries shared by the Streamlit app and the metrics API.
+
+Queries use :name bind parameters. {filters} marks where the optional
+segment/region/channel conditions on dim_account (aliased da) are inserted,
+and {schema} is the tenant's warehouse schema (marts live in {schema}_marts).
+Monthly facts alias dim_account_history as da instead, joined to the account
+version in force at the end of each month, so history is sliced by the
+attributes accounts had at the time.
+"""
+import re
+
+FILTER_COLUMNS = {
+    'segment': 'da.segment',
+    'region': 'da.region',
+    'channel': 'da.acquisition_channel',
+}
+
+BIND_PATTERN = re.compile(r'(?<![:\w]):(\w+)')
+MART_PATTERN = re.compile(r'\{schema\}_marts\.(\w+)')
+
+QUERIES = {
+    'account_attributes': """
+        SELECT account_id, segment, region, acquisition_channel
+        FROM {schema}_marts.dim_account
+        ORDER BY account_id
+    """,
+    'account_history': """
+        SELECT account_id, segment, region, acquisition_channel, valid_from, valid_to
+        FROM {schema}_marts.dim_account_history
+    """,
+    'account_activity': """
+        SELECT account_id, revenue_month AS month
+        FROM {schema}_marts.fct_revenue_monthly
+        WHERE mrr > 0
+    """,
+    'filter_options': """
+        SELECT DISTINCT segment, region, acquisition_channel FROM {schema}_marts.dim_account ORDER BY 1, 2, 3
+    """,
+    'kpis': """
+        WITH latest_month AS (
+            SELECT MAX(revenue_month) as max_month
+            FROM {schema}_marts.fct_revenue_monthly
+        ),
+        current_metrics AS (
+            SELECT
+                SUM(r.mrr) as current_mrr,
+                SUM(r.arr) as current_arr,
+                AVG(CASE WHEN r.nrr IS NOT NULL THEN r.nrr ELSE 0 END) as avg_nrr,
+                SUM(r.churned_mrr) as churned_mrr
+            FROM {schema}_marts.fct_revenue_monthly r
+            JOIN {schema}_marts.dim_account_history da ON r.account_id = da.account_id
+                AND da.valid_during @> (r.revenue_month + interval '1 month' - interval '1 microsecond')
+            WHERE r.revenue_month = (SELECT max_month FROM latest_month)
+            {filters}
+        ),
+        activation_metrics AS (
+            SELECT AVG(activation_rate) as avg_activation_rate
+            FROM {schema}_marts.fct_activation a
+            JOIN {schema}_marts.dim_account da ON a.account_id = da.account_id
+            WHERE 1=1 {filters}
+        ),
+        cac_metrics AS (
+            SELECT AVG(cac) as avg_cac
+            FROM {schema}_marts.fct_cac_ltv
+        )
+        SELECT
+            (SELECT max_month FROM latest_month) as latest_month,
+            cm.current_mrr,
+            cm.current_arr,
+            cm.avg_nrr,
+            cm.churned_mrr,
+            am.avg_activation_rate,
+            cm2.avg_cac
+        FROM current_metrics cm
+        CROSS JOIN activation_metrics am
+        CROSS JOIN cac_metrics cm2
+    """,
+    'mrr_trend': """
+        SELECT
+            r.revenue_month,
+            SUM(r.mrr) as total_mrr,
+            SUM(r.new_mrr) as new_mrr,
+            SUM(r.expansion_mrr) as expansion_mrr,
+            SUM(r.churned_mrr) as churned_mrr
+        FROM {schema}_marts.fct_revenue_monthly r
+        JOIN {schema}_marts.dim_account_history da ON r.account_id = da.account_id
+            AND da.valid_during @> (r.revenue_month + interval '1 month' - interval '1 microsecond')
+        WHERE 1=1 {filters}
+        GROUP BY 1
+        ORDER BY 1
+    """,
+    'revenue_by_segment': """
+        SELECT
+            da.segment,
+            SUM(r.mrr) as total_mrr
+        FROM {schema}_marts.fct_revenue_monthly r
+        JOIN {schema}_marts.dim_account_history da ON r.account_id = da.account_id
+            AND da.valid_during @> (r.revenue_month + interval '1 month' - interval '1 microsecond')
+        WHERE r.revenue_month = (SELECT MAX(revenue_month) FROM {schema}_marts.fct_revenue_monthly)
+        {filters}
+        GROUP BY 1
+        ORDER BY 2 DESC
+    """,
+    'win_rate_by_segment': """
+        SELECT segment, win_rate, won_deals, lost_deals
+        FROM {schema}_marts.fct_pipeline
+        WHERE win_rate IS NOT NULL
+        ORDER BY segment
+    """,
+    'sales_cycle': """
+        SELECT segment, avg_sales_cycle_days
+        FROM {schema}_marts.fct_pipeline
+        WHERE stage = 'Closed Won'
+        ORDER BY segment
+    """,
+    'deal_value': """
+        SELECT
+            segment,
+            stage,
+            avg_deal_value,
+            deal_count
+        FROM {schema}_marts.fct_pipeline
+        WHERE stage IN ('Closed Won', 'Closed Lost')
+        ORDER BY segment, stage
+    """,
+    'retention_matrix': """
+        SELECT
+            cohort_month,
+            retention_pct_by_age
+        FROM {schema}_marts.fct_retention_matrix
+        WHERE segment = :segment
+          AND region = :region
+          AND acquisition_channel = :channel
+        ORDER BY cohort_month
+    """,
+    'activation_retention': """
+        SELECT
+            a.segment,
+            AVG(a.activation_rate) as avg_activation,
+            AVG(r.retention_rate) as avg_retention
+        FROM {schema}_marts.fct_activation a
+        JOIN {schema}_marts.dim_account da ON a.account_id = da.account_id
+        JOIN {schema}_marts.fct_retention r ON date_trunc('month', da.created_at) = r.cohort_month
+        WHERE r.months_since_cohort = 6
+        {filters}
+        GROUP BY 1
+    """,
+    'churn_by_cohort': """
+        SELECT
+            cohort_month,
+            AVG(churn_rate) as avg_churn_rate
+        FROM {schema}_marts.fct_retention
+        WHERE months_since_cohort BETWEEN 3 AND 6
+        GROUP BY 1
+        ORDER BY 1
+    """,
+    'support_summary': """
+        WITH account_support AS (
+            SELECT
+                s.account_id,
+                SUM(s.total_tickets) as total_tickets,
+                SUM(s.sla_breached_tickets)::numeric / NULLIF(SUM(s.total_tickets), 0) as sla_breach_rate,
+                SUM(s.total_resolution_hours) / NULLIF(SUM(s.resolved_tickets), 0) as avg_resolution_hours
+            FROM {schema}_marts.fct_support_monthly s
+            JOIN {schema}_marts.dim_account_history da ON s.account_id = da.account_id
+                AND da.valid_during @> (s.ticket_month + interval '1 month' - interval '1 microsecond')
+            WHERE 1=1 {filters}
+            GROUP BY 1
+        )
+        SELECT
+            SUM(total_tickets) as total_tickets,
+            AVG(sla_breach_rate) as avg_sla_breach_rate,
+            AVG(avg_resolution_hours) as avg_resolution_hours
+        FROM account_support
+    """,
+    'tickets_by_segment': """
+        SELECT
+            da.segment,
+            SUM(s.total_tickets) as tickets,
+            SUM(s.critical_tickets) as critical,
+            SUM(s.high_tickets) as high
+        FROM {schema}_marts.fct_support_monthly s
+        JOIN {schema}_marts.dim_account_history da ON s.account_id = da.account_id
+            AND da.valid_during @> (s.ticket_month + interval '1 month' - interval '1 microsecond')
+        WHERE 1=1 {filters}
+        GROUP BY 1
+        ORDER BY 2 DESC
+    """,
+    'sla_by_region': """
+        SELECT
+            da.region,
+            AVG(s.sla_breach_rate) as breach_rate,
+            AVG(s.median_resolution_hours) as median_res_hours
+        FROM {schema}_marts.fct_support s
+        JOIN {schema}_marts.dim_account da ON s.account_id = da.account_id
+        WHERE 1=1 {filters}
+        GROUP BY 1
+        ORDER BY 2 DESC
+    """,
+    'cac_by_channel': """
+        SELECT
+            channel,
+            total_spend,
+            accounts_acquired,
+            cac,
+            ltv,
+            ltv_cac_ratio,
+            cac_payback_months,
+            roas
+        FROM {schema}_marts.fct_cac_ltv
+        ORDER BY channel
+    """,
+    'cac_monthly': """
+        SELECT
+            channel,
+            cohort_month,
+            spend,
+            accounts_acquired,
+            cac,
+            ltv,
+            ltv_cac_ratio,
+            cac_payback_months
+        FROM {schema}_marts.fct_cac_monthly
+        ORDER BY cohort_month, channel
+    """,
+    'anomalies': """
+        SELECT
+            metric_month,
+            metric_name,
+            metric_value,
+            prev_month_value,
+            pct_change,
+            anomaly_severity,
+            anomaly_type
+        FROM {schema}_marts.fct_anomalies
+        ORDER BY metric_month DESC, ABS(pct_change) DESC
+        LIMIT 50
+    """,
+    'metric_trend': """
+        SELECT
+            metric_month,
+            metric_value,
+            pct_change
+        FROM {schema}_marts.fct_anomalies
+        WHERE metric_name = :metric_name
+        ORDER BY metric_month
+    """,
+    'forecast_book': """
+        SELECT
+            da.segment,
+            r.mrr
+        FROM {schema}_marts.fct_revenue_monthly r
+        JOIN {schema}_marts.dim_account_history da ON r.account_id = da.account_id
+            AND da.valid_during @> (r.revenue_month + interval '1 month' - interval '1 microsecond')
+        WHERE r.revenue_month = (SELECT MAX(revenue_month) FROM {schema}_marts.fct_revenue_monthly)
+          AND r.mrr > 0
+        {filters}
+    """,
+    'forecast_rates': """
+        WITH cohort_ages AS (
+            -- Aliased da so the filters apply to the cohort grid's segment/region/channel columns
+            SELECT da.segment, da.cohort_month, da.months_since_cohort, SUM(da.active_accounts) AS active_accounts
+            FROM {schema}_marts.fct_retention_cohorts da
+            WHERE da.months_since_cohort >= 1
+            {filters}
+            GROUP BY 1, 2, 3
+        ),
+        transitions AS (
+            SELECT
+                segment,
+                active_accounts AS prior_active,
+                LEAD(active_accounts) OVER (PARTITION BY segment, cohort_month ORDER BY months_since_cohort) AS next_active
+            FROM cohort_ages
+        ),
+        churn AS (
+            SELECT segment, 1 - SUM(next_active)::numeric / NULLIF(SUM(prior_active), 0) AS churn_rate
+            FROM transitions
+            WHERE next_active IS NOT NULL
+            GROUP BY 1
+        ),
+        movements AS (
+            SELECT
+                da.segment,
+                AVG(CASE WHEN r.revenue_type = 'expansion' THEN 1.0 ELSE 0 END) FILTER (WHERE r.prior_month_mrr > 0) AS expansion_rate,
+                AVG(r.expansion_mrr / r.prior_month_mrr) FILTER (WHERE r.revenue_type = 'expansion') AS expansion_uplift,
+                AVG(CASE WHEN r.revenue_type = 'contraction' THEN 1.0 ELSE 0 END) FILTER (WHERE r.prior_month_mrr > 0) AS contraction_rate,
+                AVG(r.contraction_mrr / r.prior_month_mrr) FILTER (WHERE r.revenue_type = 'contraction') AS contraction_drop,
+                AVG(r.new_mrr) FILTER (WHERE r.revenue_type = 'new') AS new_mrr
+            FROM {schema}_marts.fct_revenue_monthly r
+            JOIN {schema}_marts.dim_account_history da ON r.account_id = da.account_id
+                AND da.valid_during @> (r.revenue_month + interval '1 month' - interval '1 microsecond')
+            WHERE 1=1 {filters}
+            GROUP BY 1
+        ),
+        new_logo_share AS (
+            -- fct_pipeline has no region or channel, so deal flow is scaled by the filtered share of new logos
+            SELECT
+                da.segment,
+                COUNT(*) FILTER (WHERE 1=1 {filters})::numeric / COUNT(*) AS share
+            FROM {schema}_marts.fct_revenue_monthly r
+            JOIN {schema}_marts.dim_account_history da ON r.account_id = da.account_id
+                AND da.valid_during @> (r.revenue_month + interval '1 month' - interval '1 microsecond')
+            WHERE r.revenue_type = 'new'
+            GROUP BY 1
+        ),
+        pipeline AS (
+            SELECT DISTINCT
+                segment,
+                win_rate,
+                (won_deals + lost_deals)::numeric
+                    / (SELECT COUNT(DISTINCT revenue_month) FROM {schema}_marts.fct_revenue_monthly) AS deals_per_month
+            FROM {schema}_marts.fct_pipeline
+            WHERE win_rate IS NOT NULL
+        )
+        SELECT
+            p.segment,
+            GREATEST(COALESCE(c.churn_rate, 0), 0) AS churn_rate,
+            COALESCE(m.expansion_rate, 0) AS expansion_rate,
+            COALESCE(m.expansion_uplift, 0) AS expansion_uplift,
+            COALESCE(m.contraction_rate, 0) AS contraction_rate,
+            COALESCE(m.contraction_drop, 0) AS contraction_drop,
+            p.win_rate,
+            p.deals_per_month * COALESCE(s.share, 0) AS deals_per_month,
+            COALESCE(m.new_mrr, 0) AS new_mrr
+        FROM pipeline p
+        LEFT JOIN churn c ON p.segment = c.segment
+        LEFT JOIN movements m ON p.segment = m.segment
+        LEFT JOIN new_logo_share s ON p.segment = s.segment
+        ORDER BY 1
+    """,
+    'latest_month': """
+        SELECT MAX(revenue_month) AS max_month FROM {schema}_marts.fct_revenue_monthly
+    """,
+    'mart_build': """
+        SELECT invocation_id FROM {schema}_marts.mart_builds ORDER BY built_at DESC LIMIT 1
+    """,
+    'model_builds': """
+        SELECT model_name, invocation_id FROM {schema}_marts.mart_model_builds
+    """,
+}
+
+# Queries served by the metrics API; the rest are internal to the dashboard
+API_QUERIES = [
+    'kpis',
+    'mrr_trend',
+    'revenue_by_segment',
+    'win_rate_by_segment',
+    'sales_cycle',
+    'deal_value',
+    'retention_matrix',
+    'activation_retention',
+    'churn_by_cohort',
+    'support_summary',
+    'tickets_by_segment',
+    'sla_by_region',
+    'cac_by_channel',
+    'cac_monthly',
+    'anomalies',
+    'metric_trend',
+]
+
+
+def normalize_filters(filters=None):
+    """Fill in 'All' for any filter that is missing or empty."""
+    filters = filters or {}
+    return {key: filters.get(key) or 'All' for key in FILTER_COLUMNS}
+
+
+def query_params(name):
+    """Bind parameters a named query needs beyond the standard filters."""
+    return sorted(set(BIND_PATTERN.findall(QUERIES[name])) - set(FILTER_COLUMNS))
+
+
+def query_models(name):
+    """dbt models a named query reads, for telling whether a rebuild changed its results."""
+    return sorted(set(MART_PATTERN.findall(QUERIES[name])))
+
+
+def uses_filters(name):
+    """Whether a named query's results depend on the segment/region/channel filters."""
+    return '{filters}' in QUERIES[name] or bool(set(BIND_PATTERN.findall(QUERIES[name])) & set(FILTER_COLUMNS))
+
+
+def render(name, filters=None, schema='public', **params):
+    """Return (sql, params) for a named query with the given filters applied."""
+    filters = normalize_filters(filters)
+    conditions = ''.join(
+        f" AND {column} = :{key}"
+        for key, column in FILTER_COLUMNS.items()
+        if filters[key] != 'All'
+    )
+    sql = QUERIES[name].replace('{filters}', conditions).replace('{schema}', schema)
+    used = set(BIND_PATTERN.findall(sql))
+    bind = {**filters, **params}
+    return sql, {key: value for key, value in bind.items() if key in used}
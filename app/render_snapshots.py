@@ -0,0 +1,215 @@
+"""Pre-render every dashboard page for every filter combination after dbt run.
+
+Query results and figures are written to a fresh snapshots/<tenant>/<render>/
+directory by a pool of worker processes, then published by atomically
+switching the tenant's CURRENT pointer to it. The dashboard serves the
+snapshot while the marts behind each page are unchanged, so viewer traffic no
+longer reaches Postgres.
+"""
+import argparse
+import itertools
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from tenants import DEFAULT_TENANT, load_tenants
+
+import figures
+from account_bitmaps import AccountBitmapIndex
+from forecast import BASELINE_SCENARIO, DEFAULT_PATHS, fan_chart_bands, simulate_mrr
+from queries import FILTER_COLUMNS, render, uses_filters
+from snapshots import ACCOUNT_INDEX, CURRENT_POINTER, SNAPSHOT_DIR, Snapshot
+
+# Queries the dashboard pages read, excluding ones parameterized beyond the filters
+PAGE_QUERIES = [
+    'kpis', 'mrr_trend', 'revenue_by_segment',
+    'win_rate_by_segment', 'sales_cycle', 'deal_value',
+    'retention_matrix', 'activation_retention', 'churn_by_cohort',
+    'support_summary', 'tickets_by_segment', 'sla_by_region',
+    'anomalies',
+    'forecast_book', 'forecast_rates', 'latest_month',
+]
+
+COMBO_QUERIES = [name for name in PAGE_QUERIES if uses_filters(name)]
+SHARED_QUERIES = [name for name in PAGE_QUERIES if not uses_filters(name)]
+
+# Figures whose only input is the query of the same name
+QUERY_FIGURES = {
+    'mrr_trend': figures.mrr_trend,
+    'revenue_by_segment': figures.revenue_by_segment,
+    'win_rate_by_segment': figures.win_rate_by_segment,
+    'sales_cycle': figures.sales_cycle,
+    'deal_value': figures.deal_value,
+    'retention_matrix': figures.retention_heatmap,
+    'activation_retention': figures.activation_retention,
+    'churn_by_cohort': figures.churn_by_cohort,
+    'tickets_by_segment': figures.tickets_by_segment,
+    'sla_by_region': figures.sla_by_region,
+}
+
+# Per-process state, set by _init_worker
+_engine = None
+_schema = None
+_index = None
+_root = None
+
+
+def run_query(name, filters=None, **params):
+    sql, bind = render(name, filters, _schema, **params)
+    with _engine.connect() as conn:
+        return pd.read_sql(text(sql), conn, params=bind)
+
+
+def _connect(tenant):
+    global _engine, _schema
+    _engine = create_engine(tenant['database_url'])
+    _schema = tenant['schema']
+
+
+def _init_worker(root, tenant):
+    global _index, _root
+    _connect(tenant)
+    _root = Path(root)
+    _index = AccountBitmapIndex.load(_root / ACCOUNT_INDEX)
+
+
+def render_shared():
+    """Pages and figures that ignore the filters, rendered once per build."""
+    snapshot = Snapshot(_root)
+    frames = {}
+    for name in SHARED_QUERIES:
+        frames[name] = run_query(name)
+        snapshot.save_frame(frames[name], name, shared=True)
+        if name in QUERY_FIGURES:
+            snapshot.save_figure(QUERY_FIGURES[name](frames[name]), name, shared=True)
+
+    anomalies = frames['anomalies']
+    if len(anomalies) > 0:
+        snapshot.save_figure(figures.anomaly_distribution(anomalies), 'anomaly_distribution', shared=True)
+    for metric_name in anomalies['metric_name'].unique():
+        trend = run_query('metric_trend', metric_name=metric_name)
+        snapshot.save_frame(trend, 'metric_trend', shared=True, metric_name=metric_name)
+        snapshot.save_figure(figures.metric_trend(trend, metric_name), 'metric_trend',
+                             shared=True, metric_name=metric_name)
+    return 'shared'
+
+
+def render_combo(filters):
+    """All filtered pages for one segment/region/channel combination."""
+    snapshot = Snapshot(_root, filters)
+    frames = {}
+    for name in COMBO_QUERIES:
+        frames[name] = run_query(name, filters)
+        snapshot.save_frame(frames[name], name)
+        if name in QUERY_FIGURES:
+            snapshot.save_figure(QUERY_FIGURES[name](frames[name]), name)
+
+    flow = _index.monthly_counts(filters['segment'], filters['region'], filters['channel'])
+    snapshot.save_frame(flow, 'account_flow')
+    snapshot.save_figure(figures.account_flow(flow), 'account_flow')
+
+    # Baseline forecast at the dashboard's default path count
+    rates = frames['forecast_rates'].set_index('segment').astype(float)
+    latest_month = Snapshot(_root).frame('latest_month')['max_month'].iloc[0]
+    bands = fan_chart_bands(simulate_mrr(frames['forecast_book'], rates, BASELINE_SCENARIO), latest_month)
+    snapshot.save_frame(bands, 'forecast_bands', num_paths=DEFAULT_PATHS)
+    snapshot.save_figure(figures.forecast_fan(bands, bands), 'forecast_mrr')
+    snapshot.save_figure(figures.forecast_fan(bands, bands, scale=12), 'forecast_arr')
+    return '/'.join(filters.values())
+
+
+def filter_combinations(options_df):
+    values = [
+        ['All'] + sorted(options_df[column.split('.')[-1]].dropna().unique().tolist())
+        for column in FILTER_COLUMNS.values()
+    ]
+    return [dict(zip(FILTER_COLUMNS, combo)) for combo in itertools.product(*values)]
+
+
+def prune_snapshots(tenant_dir, keep):
+    """Remove all but the tenant's most recent renders, never the one CURRENT points at.
+
+    Older renders are kept for a while so readers that resolved the pointer
+    just before a publish can finish.
+    """
+    current = (tenant_dir / CURRENT_POINTER).read_text().strip()
+    renders = sorted(
+        (path for path in tenant_dir.iterdir()
+         if path.is_dir() and not path.name.endswith('.tmp') and path.name != current),
+        key=lambda path: path.stat().st_mtime,
+        reverse=True,
+    )
+    for path in renders[max(keep - 1, 0):]:
+        shutil.rmtree(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pre-render dashboard snapshots for the latest dbt build')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Render processes')
+    parser.add_argument('--keep', type=int, default=2, help='Published builds to keep')
+    parser.add_argument('--force', action='store_true', help='Re-render even if this build is already published')
+    parser.add_argument('--tenant', default=DEFAULT_TENANT, help='Tenant ID from tenants.json')
+    args = parser.parse_args()
+
+    tenants = load_tenants()
+    if args.tenant not in tenants:
+        parser.error(f"unknown tenant: {args.tenant}")
+    tenant = tenants[args.tenant]
+    _connect(tenant)
+
+    print(f"Rendering dashboard snapshots for tenant {args.tenant}...")
+    build = run_query('mart_build')
+    if build.empty:
+        print("❌ No dbt build recorded in mart_builds; run dbt first")
+        sys.exit(1)
+    build_id = build['invocation_id'].iloc[0]
+    # Read before rendering, so marts rebuilt mid-render are treated as stale
+    model_builds = run_query('model_builds').set_index('model_name')['invocation_id'].to_dict()
+
+    tenant_dir = SNAPSHOT_DIR / args.tenant
+    published = Snapshot.current(args.tenant)
+    if published and published.manifest.get('models') == model_builds and not args.force:
+        print(f"✅ Snapshot for build {build_id} already published")
+        return
+
+    # A fresh directory per render, so a forced re-render never touches the published one
+    target = tenant_dir / f"{time.strftime('%Y%m%dT%H%M%S')}-{build_id}"
+    staging = tenant_dir / f'{target.name}.tmp'
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+
+    start = time.time()
+    accounts_df = run_query('account_attributes')
+    activity_df = run_query('account_activity')
+    activity_df['month'] = pd.to_datetime(activity_df['month'])
+    history_df = run_query('account_history')
+    AccountBitmapIndex.from_frames(accounts_df, activity_df, history_df).save(staging / ACCOUNT_INDEX)
+
+    combos = filter_combinations(run_query('filter_options'))
+    print(f"  Build {build_id}: {len(combos)} filter combinations, {args.workers} workers")
+
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=(str(staging), tenant)) as pool:
+        # Combinations read the shared forecast inputs, so those go first
+        pool.submit(render_shared).result()
+        futures = [pool.submit(render_combo, filters) for filters in combos]
+        for done, future in enumerate(as_completed(futures), 1):
+            label = future.result()
+            if done % 25 == 0 or done == len(futures):
+                print(f"    ✓ {done}/{len(futures)} ({label})")
+
+    Snapshot(staging).save_manifest(build_id=build_id, models=model_builds)
+    os.replace(staging, target)
+    Snapshot(target).publish(tenant_dir)
+    prune_snapshots(tenant_dir, args.keep)
+    print(f"\n✅ Snapshot published to {target.relative_to(Path(__file__).parent)} in {time.time() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
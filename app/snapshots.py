@@ -0,0 +1,146 @@
+"""Pre-rendered dashboard snapshots, one directory per dbt build.
+
+render_snapshots.py writes query results (Parquet) and Plotly figures (JSON
+plus standalone HTML) for every filter combination under
+snapshots/<tenant>/<render>/<segment>__<region>__<channel>/. Results that
+do not depend on the filters are written once to
+snapshots/<tenant>/<render>/_shared/. Each render goes to a fresh directory
+and snapshots/<tenant>/CURRENT names the published one, so readers never see
+a directory being replaced.
+The manifest records which dbt run last built each mart at render time. The
+dashboard serves a piece from the snapshot only while the marts it reads are
+unchanged, and queries Postgres for pieces that are missing or stale, such as
+pages over models refreshed by a partial dbt run since the render.
+"""
+import json
+import os
+import re
+from pathlib import Path
+
+import pandas as pd
+import plotly.io as pio
+
+from queries import FILTER_COLUMNS, QUERIES, normalize_filters, query_models
+
+SNAPSHOT_DIR = Path(__file__).parent / 'snapshots'
+SHARED_DIR = '_shared'
+CURRENT_POINTER = 'CURRENT'
+MANIFEST = 'manifest.json'
+# Bitmap index of monthly active accounts, saved once per render
+ACCOUNT_INDEX = 'account_index.npz'
+
+# Queries behind snapshot pieces that are not named after a single query
+PIECE_QUERIES = {
+    'account_flow': ['account_attributes', 'account_activity', 'account_history'],
+    'anomaly_distribution': ['anomalies'],
+    'forecast_bands': ['forecast_book', 'forecast_rates', 'latest_month'],
+    'forecast_mrr': ['forecast_book', 'forecast_rates', 'latest_month'],
+    'forecast_arr': ['forecast_book', 'forecast_rates', 'latest_month'],
+}
+
+
+def _slug(value):
+    return re.sub(r'[^\w.-]+', '_', str(value))
+
+
+def snapshot_key(name, **params):
+    """File stem for a query or figure, including any extra parameters."""
+    return '--'.join([name] + [f'{key}={_slug(value)}' for key, value in sorted(params.items())])
+
+
+def piece_models(name):
+    """dbt models a snapshot frame or figure was computed from."""
+    queries = PIECE_QUERIES.get(name, [name] if name in QUERIES else [])
+    return sorted({model for query in queries for model in query_models(query)})
+
+
+def combo_dirname(filters):
+    filters = normalize_filters(filters)
+    return '__'.join(_slug(filters[key]) for key in FILTER_COLUMNS)
+
+
+class Snapshot:
+    """Reads and writes one filter combination of a build snapshot.
+
+    Given the current model_builds ({model: invocation_id}), reads skip pieces
+    whose marts were rebuilt after the render.
+    """
+
+    def __init__(self, root, filters=None, model_builds=None):
+        self.root = Path(root)
+        self.combo_dir = self.root / combo_dirname(filters)
+        self.shared_dir = self.root / SHARED_DIR
+        self.model_builds = model_builds
+        self._rendered_builds = None
+
+    @classmethod
+    def current(cls, tenant, filters=None, model_builds=None):
+        """The tenant's published snapshot, or None if nothing has been rendered."""
+        pointer = SNAPSHOT_DIR / tenant / CURRENT_POINTER
+        if not pointer.exists():
+            return None
+        root = SNAPSHOT_DIR / tenant / pointer.read_text().strip()
+        return cls(root, filters, model_builds) if root.is_dir() else None
+
+    @property
+    def manifest(self):
+        path = self.root / MANIFEST
+        return json.loads(path.read_text()) if path.exists() else {}
+
+    def save_manifest(self, **manifest):
+        (self.root / MANIFEST).write_text(json.dumps(manifest, indent=2))
+
+    def publish(self, tenant_dir):
+        """Point the tenant's CURRENT at this snapshot with an atomic rename."""
+        pointer = tenant_dir / CURRENT_POINTER
+        staged = tenant_dir / f'{CURRENT_POINTER}.tmp'
+        staged.write_text(self.root.name)
+        os.replace(staged, pointer)
+
+    def is_fresh(self, name):
+        """Whether every mart behind a piece is unchanged since the render."""
+        if self.model_builds is None:
+            return True
+        if self._rendered_builds is None:
+            self._rendered_builds = self.manifest.get('models', {})
+        return all(
+            model in self.model_builds and self._rendered_builds.get(model) == self.model_builds[model]
+            for model in piece_models(name)
+        )
+
+    def account_index_path(self):
+        """The render's bitmap index, or None if it is missing or its marts were rebuilt since."""
+        path = self.root / ACCOUNT_INDEX
+        return path if path.exists() and self.is_fresh('account_flow') else None
+
+    def _find(self, subdir, filename):
+        for base in (self.combo_dir, self.shared_dir):
+            path = base / subdir / filename
+            if path.exists():
+                return path
+        return None
+
+    def _target(self, subdir, filename, shared):
+        directory = (self.shared_dir if shared else self.combo_dir) / subdir
+        directory.mkdir(parents=True, exist_ok=True)
+        return directory / filename
+
+    def frame(self, name, **params):
+        if not self.is_fresh(name):
+            return None
+        path = self._find('frames', f'{snapshot_key(name, **params)}.parquet')
+        return pd.read_parquet(path) if path else None
+
+    def figure(self, name, **params):
+        if not self.is_fresh(name):
+            return None
+        path = self._find('figures', f'{snapshot_key(name, **params)}.json')
+        return pio.read_json(path) if path else None
+
+    def save_frame(self, df, name, shared=False, **params):
+        df.to_parquet(self._target('frames', f'{snapshot_key(name, **params)}.parquet', shared))
+
+    def save_figure(self, fig, name, shared=False, **params):
+        stem = snapshot_key(name, **params)
+        fig.write_json(self._target('figures', f'{stem}.json', shared))
+        fig.write_html(self._target('figures', f'{stem}.html', shared), include_plotlyjs='cdn')
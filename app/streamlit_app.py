@@ -1,36 +1,77 @@
-import os
+import sys
 from pathlib import Path
 
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 import streamlit as st
-from dotenv import load_dotenv
 from sqlalchemy import create_engine, text
+from sqlalchemy.exc import SQLAlchemyError
 
-load_dotenv(Path(__file__).parent.parent / '.env')
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from tenants import load_tenants
 
-DB_HOST = os.getenv('POSTGRES_HOST', 'localhost')
-DB_PORT = os.getenv('POSTGRES_PORT', '5432')
-DB_NAME = os.getenv('POSTGRES_DB', 'saas_analytics')
-DB_USER = os.getenv('POSTGRES_USER', 'analytics_user')
-DB_PASSWORD = os.getenv('POSTGRES_PASSWORD', 'analytics_pass')
+import figures
+from account_bitmaps import AccountBitmapIndex
+from forecast import BASELINE_SCENARIO, DEFAULT_PATHS, fan_chart_bands, simulate_mrr
+from queries import render
+from snapshots import Snapshot, piece_models
 
-DATABASE_URL = f'postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
+TENANTS = load_tenants()
 
 
 @st.cache_resource
-def get_db_engine():
-    """Create cached database connection."""
-    return create_engine(DATABASE_URL)
+def get_db_engine(database_url):
+    """Create cached database connection, shared by tenants on the same shard."""
+    return create_engine(database_url)
 
 
 @st.cache_data(ttl=300)
-def run_query(query):
+def run_query(database_url, query, params=None):
     """Execute SQL query with caching."""
-    engine = get_db_engine()
+    engine = get_db_engine(database_url)
     with engine.connect() as conn:
-        return pd.read_sql(text(query), conn)
+        return pd.read_sql(text(query), conn, params=params)
+
+
+def tenant_query(tenant, name, filters=None, **params):
+    """Run a named query against the tenant's shard and schema."""
+    config = TENANTS[tenant]
+    return run_query(config['database_url'], *render(name, filters, config['schema'], **params))
+
+
+@st.cache_resource(max_entries=8)
+def load_account_index(path):
+    """Load a snapshot's bitmap index; every render has its own path, so entries never go stale."""
+    return AccountBitmapIndex.load(path)
+
+
+@st.cache_resource(ttl=300)
+def build_account_index(tenant):
+    """Build the bitmap index of monthly active accounts from Postgres."""
+    accounts_df = tenant_query(tenant, 'account_attributes')
+    activity_df = tenant_query(tenant, 'account_activity')
+    activity_df['month'] = pd.to_datetime(activity_df['month'])
+    history_df = tenant_query(tenant, 'account_history')
+    return AccountBitmapIndex.from_frames(accounts_df, activity_df, history_df)
+
+
+@st.cache_data(ttl=300)
+def current_model_builds(tenant):
+    """Invocation id of the dbt run that last rebuilt each of the tenant's models."""
+    try:
+        builds = tenant_query(tenant, 'model_builds')
+    except SQLAlchemyError:
+        return {}
+    return dict(zip(builds['model_name'], builds['invocation_id']))
+
+
+@st.cache_data(ttl=300, max_entries=256, show_spinner="Simulating forecast paths...")
+def forecast_bands(tenant, filters, build, scenario, num_paths, _book, _rates, latest_month):
+    """Fan chart bands for one scenario, cached because 10k paths take seconds to simulate.
+
+    The book and rates are identified by tenant, filters and the build of their
+    marts rather than hashed.
+    """
+    return fan_chart_bands(simulate_mrr(_book, _rates, scenario, num_paths=num_paths), latest_month)
 
 
 st.set_page_config(
@@ -60,8 +101,16 @@ st.markdown("*Unified view of pipeline, revenue, retention, and operational heal
 # Global filters in sidebar
 st.sidebar.header("Filters")
 
+# Each business unit's warehouse may live on a different shard. Only offer tenants with a
+# recorded dbt build (after a tenants-only setup the default warehouse has no marts)
+built_tenants = [tenant for tenant in TENANTS if current_model_builds(tenant)] or list(TENANTS)
+if len(built_tenants) > 1:
+    selected_tenant = st.sidebar.selectbox("Business Unit", built_tenants)
+else:
+    selected_tenant = built_tenants[0]
+
 # Get filter options
-accounts = run_query("SELECT DISTINCT segment, region, acquisition_channel FROM public_marts.dim_account ORDER BY 1, 2, 3")
+accounts = tenant_query(selected_tenant, 'filter_options')
 
 segment_options = ['All'] + sorted(accounts['segment'].dropna().unique().tolist())
 region_options = ['All'] + sorted(accounts['region'].dropna().unique().tolist())
@@ -71,21 +120,46 @@ selected_segment = st.sidebar.selectbox("Segment", segment_options)
 selected_region = st.sidebar.selectbox("Region", region_options)
 selected_channel = st.sidebar.selectbox("Acquisition Channel", channel_options)
 
-# Build WHERE clause for filters
-filter_conditions = []
-if selected_segment != 'All':
-    filter_conditions.append(f"da.segment = '{selected_segment}'")
-if selected_region != 'All':
-    filter_conditions.append(f"da.region = '{selected_region}'")
-if selected_channel != 'All':
-    filter_conditions.append(f"da.acquisition_channel = '{selected_channel}'")
+filters = {
+    'segment': selected_segment,
+    'region': selected_region,
+    'channel': selected_channel,
+}
+
+# Pre-rendered pages; anything missing, or over marts rebuilt since the render, is queried live
+model_builds = current_model_builds(selected_tenant)
+snapshot = Snapshot.current(selected_tenant, filters, model_builds)
+
 
-where_clause = " AND " + " AND ".join(filter_conditions) if filter_conditions else ""
+def load_frame(name, **params):
+    """Query results from the snapshot, falling back to Postgres."""
+    df = snapshot.frame(name, **params) if snapshot else None
+    return df if df is not None else tenant_query(selected_tenant, name, filters, **params)
+
+
+def show_figure(name, build, **params):
+    """Plot the snapshot figure, building it from live data only if it is missing."""
+    fig = snapshot.figure(name, **params) if snapshot else None
+    st.plotly_chart(fig if fig is not None else build(), use_container_width=True)
+
+
+def get_account_index():
+    """The published snapshot's index while its marts are current, else one built from Postgres."""
+    path = snapshot.account_index_path() if snapshot else None
+    return load_account_index(path) if path else build_account_index(selected_tenant)
+
+
+def load_account_flow():
+    df = snapshot.frame('account_flow') if snapshot else None
+    if df is not None:
+        return df
+    return get_account_index().monthly_counts(selected_segment, selected_region, selected_channel)
 
 # Navigation
 page = st.sidebar.radio(
     "Navigate",
-    ["Executive Overview", "Funnel & Pipeline", "Retention & Cohorts", "Support & Quality", "Anomalies"]
+    ["Executive Overview", "Funnel & Pipeline", "Retention & Cohorts", "Support & Quality", "Anomalies",
+     "Revenue Forecast"]
 )
 
 
@@ -96,47 +170,11 @@ if page == "Executive Overview":
     st.header("Executive Overview")
     
     # KPI Cards
-    kpi_query = f"""
-    WITH latest_month AS (
-        SELECT MAX(revenue_month) as max_month
-        FROM public_marts.fct_revenue_monthly
-    ),
-    current_metrics AS (
-        SELECT
-            SUM(r.mrr) as current_mrr,
-            SUM(r.arr) as current_arr,
-            AVG(CASE WHEN r.nrr IS NOT NULL THEN r.nrr ELSE 0 END) as avg_nrr,
-            SUM(r.churned_mrr) as churned_mrr,
-            COUNT(DISTINCT r.account_id) as active_accounts
-        FROM public_marts.fct_revenue_monthly r
-        JOIN public_marts.dim_account da ON r.account_id = da.account_id
-        WHERE r.revenue_month = (SELECT max_month FROM latest_month)
-        {where_clause}
-    ),
-    activation_metrics AS (
-        SELECT AVG(activation_rate) as avg_activation_rate
-        FROM public_marts.fct_activation a
-        JOIN public_marts.dim_account da ON a.account_id = da.account_id
-        WHERE 1=1 {where_clause}
-    ),
-    cac_metrics AS (
-        SELECT AVG(cac) as avg_cac
-        FROM public_marts.fct_cac_ltv
-    )
-    SELECT
-        cm.current_mrr,
-        cm.current_arr,
-        cm.avg_nrr,
-        cm.churned_mrr,
-        cm.active_accounts,
-        am.avg_activation_rate,
-        cm2.avg_cac
-    FROM current_metrics cm
-    CROSS JOIN activation_metrics am
-    CROSS JOIN cac_metrics cm2
-    """
-    
-    kpis = run_query(kpi_query)
+    kpis = load_frame('kpis')
+    account_flow = load_account_flow()
+    active_accounts = account_flow.loc[
+        account_flow['month'] == pd.Timestamp(kpis['latest_month'].iloc[0]), 'active_accounts'
+    ].sum()
     
     col1, col2, col3, col4 = st.columns(4)
     
@@ -147,7 +185,7 @@ if page == "Executive Overview":
     with col2:
         nrr_pct = kpis['avg_nrr'].iloc[0] * 100 if pd.notna(kpis['avg_nrr'].iloc[0]) else 0
         st.metric("NRR", f"{nrr_pct:.1f}%")
-        st.metric("Active Accounts", f"{kpis['active_accounts'].iloc[0]:,.0f}")
+        st.metric("Active Accounts", f"{active_accounts:,.0f}")
     
     with col3:
         activation_pct = kpis['avg_activation_rate'].iloc[0] * 100 if pd.notna(kpis['avg_activation_rate'].iloc[0]) else 0
@@ -165,47 +203,11 @@ if page == "Executive Overview":
     
     with col1:
         st.subheader("MRR Trend")
-        mrr_trend = run_query(f"""
-            SELECT
-                r.revenue_month,
-                SUM(r.mrr) as total_mrr,
-                SUM(r.new_mrr) as new_mrr,
-                SUM(r.expansion_mrr) as expansion_mrr,
-                SUM(r.churned_mrr) as churned_mrr
-            FROM public_marts.fct_revenue_monthly r
-            JOIN public_marts.dim_account da ON r.account_id = da.account_id
-            WHERE 1=1 {where_clause}
-            GROUP BY 1
-            ORDER BY 1
-        """)
-        
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(x=mrr_trend['revenue_month'], y=mrr_trend['total_mrr'],
-                                mode='lines+markers', name='Total MRR', line=dict(width=3)))
-        fig.add_trace(go.Scatter(x=mrr_trend['revenue_month'], y=mrr_trend['new_mrr'],
-                                mode='lines', name='New MRR', line=dict(dash='dot')))
-        fig.add_trace(go.Scatter(x=mrr_trend['revenue_month'], y=mrr_trend['expansion_mrr'],
-                                mode='lines', name='Expansion', line=dict(dash='dot')))
-        fig.update_layout(height=400, hovermode='x unified')
-        st.plotly_chart(fig, use_container_width=True)
+        show_figure('mrr_trend', lambda: figures.mrr_trend(load_frame('mrr_trend')))
     
     with col2:
         st.subheader("Revenue by Segment")
-        segment_rev = run_query(f"""
-            SELECT
-                da.segment,
-                SUM(r.mrr) as total_mrr
-            FROM public_marts.fct_revenue_monthly r
-            JOIN public_marts.dim_account da ON r.account_id = da.account_id
-            WHERE r.revenue_month = (SELECT MAX(revenue_month) FROM public_marts.fct_revenue_monthly)
-            {where_clause}
-            GROUP BY 1
-            ORDER BY 2 DESC
-        """)
-        
-        fig = px.pie(segment_rev, values='total_mrr', names='segment', hole=0.4)
-        fig.update_layout(height=400)
-        st.plotly_chart(fig, use_container_width=True)
+        show_figure('revenue_by_segment', lambda: figures.revenue_by_segment(load_frame('revenue_by_segment')))
 
 
 # PAGE 2: FUNNEL & PIPELINE
@@ -216,54 +218,19 @@ elif page == "Funnel & Pipeline":
     
     with col1:
         st.subheader("Win Rate by Segment")
-        pipeline = run_query("""
-            SELECT segment, win_rate, won_deals, lost_deals
-            FROM public_marts.fct_pipeline
-            WHERE win_rate IS NOT NULL
-            ORDER BY segment
-        """)
+        pipeline = load_frame('win_rate_by_segment')
         
-        fig = px.bar(pipeline, x='segment', y='win_rate', text='win_rate',
-                    labels={'win_rate': 'Win Rate', 'segment': 'Segment'})
-        fig.update_traces(texttemplate='%{text:.1%}', textposition='outside')
-        fig.update_layout(height=400)
-        st.plotly_chart(fig, use_container_width=True)
+        show_figure('win_rate_by_segment', lambda: figures.win_rate_by_segment(pipeline))
         
         st.dataframe(pipeline, use_container_width=True)
     
     with col2:
         st.subheader("Sales Cycle Length")
-        sales_cycle = run_query("""
-            SELECT segment, avg_sales_cycle_days
-            FROM public_marts.fct_pipeline
-            WHERE stage = 'Closed Won'
-            ORDER BY segment
-        """)
-        
-        fig = px.bar(sales_cycle, x='segment', y='avg_sales_cycle_days',
-                    labels={'avg_sales_cycle_days': 'Avg Days', 'segment': 'Segment'},
-                    color='avg_sales_cycle_days', color_continuous_scale='Blues')
-        fig.update_layout(height=400, showlegend=False)
-        st.plotly_chart(fig, use_container_width=True)
+        show_figure('sales_cycle', lambda: figures.sales_cycle(load_frame('sales_cycle')))
     
     st.markdown("---")
     st.subheader("Deal Value Distribution")
-    deal_value = run_query("""
-        SELECT
-            segment,
-            stage,
-            avg_deal_value,
-            deal_count
-        FROM public_marts.fct_pipeline
-        WHERE stage IN ('Closed Won', 'Closed Lost')
-        ORDER BY segment, stage
-    """)
-    
-    fig = px.bar(deal_value, x='segment', y='avg_deal_value', color='stage',
-                barmode='group', text='deal_count',
-                labels={'avg_deal_value': 'Avg Deal Value', 'deal_count': 'Count'})
-    fig.update_layout(height=400)
-    st.plotly_chart(fig, use_container_width=True)
+    show_figure('deal_value', lambda: figures.deal_value(load_frame('deal_value')))
 
 
 # PAGE 3: RETENTION & COHORTS
@@ -272,36 +239,12 @@ elif page == "Retention & Cohorts":
     
     st.subheader("Cohort Retention Heatmap")
     
-    cohort_data = run_query("""
-        SELECT
-            cohort_month,
-            months_since_cohort,
-            retention_rate
-        FROM public_marts.fct_retention
-        WHERE months_since_cohort <= 12
-        ORDER BY cohort_month, months_since_cohort
-    """)
-    
-    # Pivot for heatmap
-    cohort_pivot = cohort_data.pivot(index='cohort_month', columns='months_since_cohort', values='retention_rate')
-    
-    fig = go.Figure(data=go.Heatmap(
-        z=cohort_pivot.values * 100,
-        x=cohort_pivot.columns,
-        y=cohort_pivot.index,
-        colorscale='RdYlGn',
-        text=cohort_pivot.values * 100,
-        texttemplate='%{text:.0f}%',
-        textfont={"size": 10},
-        colorbar=dict(title="Retention %")
-    ))
-    
-    fig.update_layout(
-        xaxis_title="Months Since Cohort",
-        yaxis_title="Cohort Month",
-        height=500
-    )
-    st.plotly_chart(fig, use_container_width=True)
+    show_figure('retention_matrix', lambda: figures.retention_heatmap(load_frame('retention_matrix')))
+    
+    st.markdown("---")
+    st.subheader("Active, Retained & Churned Accounts")
+    
+    show_figure('account_flow', lambda: figures.account_flow(load_account_flow()))
     
     st.markdown("---")
     
@@ -309,42 +252,12 @@ elif page == "Retention & Cohorts":
     
     with col1:
         st.subheader("Activation vs Retention")
-        activation_retention = run_query(f"""
-            SELECT
-                a.segment,
-                AVG(a.activation_rate) as avg_activation,
-                AVG(r.retention_rate) as avg_retention
-            FROM public_marts.fct_activation a
-            JOIN public_marts.dim_account da ON a.account_id = da.account_id
-            JOIN public_marts.fct_retention r ON date_trunc('month', da.created_at) = r.cohort_month
-            WHERE r.months_since_cohort = 6
-            {where_clause}
-            GROUP BY 1
-        """)
-        
-        fig = px.scatter(activation_retention, x='avg_activation', y='avg_retention',
-                        size=[100]*len(activation_retention), text='segment',
-                        labels={'avg_activation': 'Activation Rate', 'avg_retention': '6-Month Retention'})
-        fig.update_traces(textposition='top center')
-        fig.update_layout(height=400)
-        st.plotly_chart(fig, use_container_width=True)
+        show_figure('activation_retention',
+                    lambda: figures.activation_retention(load_frame('activation_retention')))
     
     with col2:
         st.subheader("Churn by Cohort")
-        churn_trend = run_query("""
-            SELECT
-                cohort_month,
-                AVG(churn_rate) as avg_churn_rate
-            FROM public_marts.fct_retention
-            WHERE months_since_cohort BETWEEN 3 AND 6
-            GROUP BY 1
-            ORDER BY 1
-        """)
-        
-        fig = px.line(churn_trend, x='cohort_month', y='avg_churn_rate',
-                     markers=True, labels={'avg_churn_rate': 'Avg Churn Rate (3-6mo)'})
-        fig.update_layout(height=400)
-        st.plotly_chart(fig, use_container_width=True)
+        show_figure('churn_by_cohort', lambda: figures.churn_by_cohort(load_frame('churn_by_cohort')))
 
 
 # PAGE 4: SUPPORT & QUALITY
@@ -353,15 +266,7 @@ elif page == "Support & Quality":
     
     col1, col2, col3 = st.columns(3)
     
-    support_summary = run_query(f"""
-        SELECT
-            SUM(total_tickets) as total_tickets,
-            AVG(sla_breach_rate) as avg_sla_breach_rate,
-            AVG(avg_resolution_hours) as avg_resolution_hours
-        FROM public_marts.fct_support s
-        JOIN public_marts.dim_account da ON s.account_id = da.account_id
-        WHERE 1=1 {where_clause}
-    """)
+    support_summary = load_frame('support_summary')
     
     with col1:
         st.metric("Total Tickets", f"{support_summary['total_tickets'].iloc[0]:,.0f}")
@@ -380,43 +285,11 @@ elif page == "Support & Quality":
     
     with col1:
         st.subheader("Ticket Volume by Segment")
-        tickets_by_segment = run_query(f"""
-            SELECT
-                da.segment,
-                SUM(s.total_tickets) as tickets,
-                SUM(s.critical_tickets) as critical,
-                SUM(s.high_tickets) as high
-            FROM public_marts.fct_support s
-            JOIN public_marts.dim_account da ON s.account_id = da.account_id
-            WHERE 1=1 {where_clause}
-            GROUP BY 1
-            ORDER BY 2 DESC
-        """)
-        
-        fig = px.bar(tickets_by_segment, x='segment', y=['critical', 'high', 'tickets'],
-                    barmode='group', labels={'value': 'Ticket Count', 'variable': 'Severity'})
-        fig.update_layout(height=400)
-        st.plotly_chart(fig, use_container_width=True)
+        show_figure('tickets_by_segment', lambda: figures.tickets_by_segment(load_frame('tickets_by_segment')))
     
     with col2:
         st.subheader("SLA Performance by Region")
-        sla_by_region = run_query(f"""
-            SELECT
-                da.region,
-                AVG(s.sla_breach_rate) as breach_rate,
-                AVG(s.median_resolution_hours) as median_res_hours
-            FROM public_marts.fct_support s
-            JOIN public_marts.dim_account da ON s.account_id = da.account_id
-            WHERE 1=1 {where_clause}
-            GROUP BY 1
-            ORDER BY 2 DESC
-        """)
-        
-        fig = px.bar(sla_by_region, x='region', y='breach_rate',
-                    labels={'breach_rate': 'SLA Breach Rate', 'region': 'Region'},
-                    color='breach_rate', color_continuous_scale='Reds')
-        fig.update_layout(height=400)
-        st.plotly_chart(fig, use_container_width=True)
+        show_figure('sla_by_region', lambda: figures.sla_by_region(load_frame('sla_by_region')))
 
 
 # PAGE 5: ANOMALIES
@@ -425,19 +298,7 @@ elif page == "Anomalies":
     
     st.markdown("Flagging month-over-month changes >10%")
     
-    anomalies = run_query("""
-        SELECT
-            metric_month,
-            metric_name,
-            metric_value,
-            prev_month_value,
-            pct_change,
-            anomaly_severity,
-            anomaly_type
-        FROM public_marts.fct_anomalies
-        ORDER BY metric_month DESC, ABS(pct_change) DESC
-        LIMIT 50
-    """)
+    anomalies = load_frame('anomalies')
     
     if len(anomalies) > 0:
         col1, col2 = st.columns([2, 1])
@@ -459,13 +320,7 @@ elif page == "Anomalies":
         with col2:
             st.subheader("Anomaly Distribution")
             
-            anomaly_counts = anomalies['anomaly_type'].value_counts()
-            
-            fig = px.pie(values=anomaly_counts.values, names=anomaly_counts.index,
-                        color=anomaly_counts.index,
-                        color_discrete_map={'Spike': '#28a745', 'Drop': '#dc3545'})
-            fig.update_layout(height=300)
-            st.plotly_chart(fig, use_container_width=True)
+            show_figure('anomaly_distribution', lambda: figures.anomaly_distribution(anomalies))
             
             st.subheader("Severity Breakdown")
             severity_counts = anomalies['anomaly_severity'].value_counts()
@@ -478,22 +333,83 @@ elif page == "Anomalies":
     
     selected_metric = st.selectbox("Select Metric", anomalies['metric_name'].unique())
     
-    metric_trend = run_query(f"""
-        SELECT
-            metric_month,
-            metric_value,
-            pct_change
-        FROM public_marts.fct_anomalies
-        WHERE metric_name = '{selected_metric}'
-        ORDER BY metric_month
-    """)
-    
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=metric_trend['metric_month'], y=metric_trend['metric_value'],
-                            mode='lines+markers', name=selected_metric, line=dict(width=2)))
-    fig.update_layout(height=400, hovermode='x unified',
-                     yaxis_title=selected_metric, xaxis_title='Month')
-    st.plotly_chart(fig, use_container_width=True)
+    show_figure('metric_trend',
+                lambda: figures.metric_trend(load_frame('metric_trend', metric_name=selected_metric), selected_metric),
+                metric_name=selected_metric)
+
+
+# PAGE 6: REVENUE FORECAST
+elif page == "Revenue Forecast":
+    st.header("Revenue Forecast Scenarios")
+    
+    st.markdown("Monte Carlo simulation of the next 12 months of MRR from current accounts, "
+                "historical churn and expansion, and pipeline win rates")
+    
+    book = load_frame('forecast_book')
+    
+    rates = load_frame('forecast_rates').set_index('segment').astype(float)
+    
+    st.subheader("Scenario")
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        churn_delta = st.slider("Monthly churn change (pp)", -5.0, 5.0, 0.0, 0.5)
+        expansion_delta = st.slider("Monthly expansion change (pp)", -5.0, 5.0, 0.0, 0.5)
+    
+    with col2:
+        win_rate_delta = {
+            segment: st.slider(f"{segment} win rate change (pp)", -20.0, 20.0, 0.0, 1.0)
+            for segment in rates.index
+        }
+    
+    with col3:
+        num_paths = st.select_slider("Simulated paths", options=[1000, 5000, DEFAULT_PATHS], value=DEFAULT_PATHS)
+        st.dataframe(rates[['churn_rate', 'expansion_rate', 'win_rate', 'deals_per_month']].round(3),
+                     use_container_width=True)
+    
+    scenario = {
+        'churn_delta_pp': churn_delta,
+        'expansion_delta_pp': expansion_delta,
+        'win_rate_delta_pp': win_rate_delta,
+    }
+    
+    latest_month = load_frame('latest_month')['max_month'].iloc[0]
+    
+    # Same seed for both runs so the gap reflects the scenario, not sampling noise
+    forecast_build = tuple((model, model_builds.get(model)) for model in piece_models('forecast_bands'))
+    baseline_bands = snapshot.frame('forecast_bands', num_paths=num_paths) if snapshot else None
+    if baseline_bands is None:
+        baseline_bands = forecast_bands(selected_tenant, filters, forecast_build, BASELINE_SCENARIO, num_paths,
+                                        book, rates, latest_month)
+    is_baseline = churn_delta == 0 and expansion_delta == 0 and not any(win_rate_delta.values())
+    if is_baseline:
+        scenario_bands = baseline_bands
+    else:
+        scenario_bands = forecast_bands(selected_tenant, filters, forecast_build, scenario, num_paths,
+                                        book, rates, latest_month)
+    
+    col1, col2 = st.columns(2)
+    
+    for col, title, name, scale in [(col1, "MRR Forecast", 'forecast_mrr', 1), (col2, "ARR Forecast", 'forecast_arr', 12)]:
+        with col:
+            st.subheader(title)
+            build = lambda: figures.forecast_fan(scenario_bands, baseline_bands, scale)
+            if is_baseline and num_paths == DEFAULT_PATHS:
+                show_figure(name, build)
+            else:
+                st.plotly_chart(build(), use_container_width=True)
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.metric("Median MRR in 12 Months", f"${scenario_bands['p50'].iloc[-1]:,.0f}",
+                  f"${scenario_bands['p50'].iloc[-1] - baseline_bands['p50'].iloc[-1]:,.0f} vs baseline")
+    
+    with col2:
+        st.metric("Median ARR in 12 Months", f"${scenario_bands['p50'].iloc[-1] * 12:,.0f}")
+    
+    with col3:
+        st.metric("5th Percentile MRR", f"${scenario_bands['p5'].iloc[-1]:,.0f}")
 
 
 st.sidebar.markdown("---")
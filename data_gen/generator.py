@@ -1,5 +1,8 @@
+import argparse
 import os
 import random
+import time
+import zlib
 from datetime import datetime, timedelta
 from pathlib import Path
 
@@ -8,12 +11,19 @@ import pandas as pd
 from faker import Faker
 
 fake = Faker()
-Faker.seed(42)
-random.seed(42)
-np.random.seed(42)
+
+
+def seed_generators(seed):
+    Faker.seed(seed)
+    random.seed(seed)
+    np.random.seed(seed)
+
+
+seed_generators(42)
 
 OUTPUT_DIR = Path(__file__).parent / "output"
 OUTPUT_DIR.mkdir(exist_ok=True)
+STREAM_DIR = OUTPUT_DIR / "stream"
 
 START_DATE = datetime(2024, 7, 1)
 END_DATE = datetime(2025, 12, 31)
@@ -30,6 +40,12 @@ SEVERITIES = ['Low', 'Medium', 'High', 'Critical']
 NUM_ACCOUNTS = 500
 AVG_USERS_PER_ACCOUNT = 8
 
+# Stream mode: per-user Pareto activity and local-time diurnal curve
+STREAM_EVENT_TYPES = ['login', 'feature_use']
+STREAM_EVENT_WEIGHTS = [0.25, 0.75]
+ACTIVITY_PARETO_ALPHA = 1.2
+REGION_UTC_OFFSETS = {'North America': -6, 'EMEA': 1, 'APAC': 8, 'LATAM': -4}
+
 
 def generate_accounts():
     """Generate B2B customer accounts with realistic distribution."""
@@ -318,7 +334,106 @@ def generate_marketing_spend(accounts_df):
     return pd.DataFrame(spend_records)
 
 
-def main():
+def load_stream_population():
+    """Load users with their account region, generating them if no CSVs exist."""
+    users_path = OUTPUT_DIR / 'users.csv'
+    accounts_path = OUTPUT_DIR / 'accounts.csv'
+    
+    if users_path.exists() and accounts_path.exists():
+        users = pd.read_csv(users_path, usecols=['user_id', 'account_id'])
+        accounts = pd.read_csv(accounts_path, usecols=['account_id', 'region'])
+    else:
+        accounts = generate_accounts()
+        users = generate_users(accounts)[['user_id', 'account_id']]
+    
+    return users.merge(accounts[['account_id', 'region']], on='account_id', how='left').reset_index(drop=True)
+
+
+def diurnal_factor(local_hours):
+    """Relative activity by local hour: peaks mid-afternoon, troughs overnight (mean ~1)."""
+    return np.clip(1 + 0.9 * np.cos(2 * np.pi * (local_hours - 14) / 24), 0.05, None)
+
+
+def generate_event_batch(population, activity_rates, utc_offsets, window_start, window_seconds,
+                         expected_events, first_seq, run_tag, rng):
+    """Generate one batch of timestamped login/feature_use events."""
+    utc_hour = window_start.hour + window_start.minute / 60
+    diurnal = diurnal_factor((utc_hour + utc_offsets) % 24)
+    weights = activity_rates * diurnal
+    
+    # Throughput stays at the target; the diurnal curve shifts which regions are active
+    num_events = rng.poisson(expected_events)
+    if num_events == 0:
+        return pd.DataFrame(columns=['event_id', 'user_id', 'account_id', 'event_type', 'event_timestamp'])
+    
+    user_idx = rng.choice(len(population), size=num_events, p=weights / weights.sum())
+    offsets = np.sort(rng.uniform(0, window_seconds, num_events))
+    seq = pd.Series(np.arange(first_seq, first_seq + num_events)).astype(str).str.zfill(12)
+    
+    return pd.DataFrame({
+        'event_id': f'EVS{run_tag}' + seq,
+        'user_id': population['user_id'].to_numpy()[user_idx],
+        'account_id': population['account_id'].to_numpy()[user_idx],
+        'event_type': rng.choice(STREAM_EVENT_TYPES, size=num_events, p=STREAM_EVENT_WEIGHTS),
+        'event_timestamp': pd.Timestamp(window_start) + pd.to_timedelta(offsets, unit='s'),
+    })
+
+
+def stream_product_events(events_per_sec, duration, rotate_seconds, batch_seconds, speedup, start):
+    """Stream events at a target rate into rotating CSV files.
+    
+    Files are written as .csv.tmp and renamed once complete, so consumers
+    tailing STREAM_DIR only ever see finished files.
+    """
+    STREAM_DIR.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng()
+    run_tag = datetime.now().strftime('%y%m%d%H%M%S')
+    
+    population = load_stream_population()
+    activity_rates = np.random.pareto(ACTIVITY_PARETO_ALPHA, len(population)) + 1
+    utc_offsets = population['region'].map(REGION_UTC_OFFSETS).fillna(0).to_numpy()
+    
+    print(f"Streaming ~{events_per_sec:,} events/sec for {len(population):,} users → {STREAM_DIR}")
+    
+    sim_clock = start
+    seq = 1
+    file_index = 0
+    run_start = time.monotonic()
+    next_tick = run_start
+    
+    while duration is None or time.monotonic() - run_start < duration:
+        file_index += 1
+        final_path = STREAM_DIR / f'product_events_{run_tag}_{file_index:06d}.csv'
+        tmp_path = final_path.with_suffix('.csv.tmp')
+        file_start = time.monotonic()
+        file_events = 0
+        
+        with open(tmp_path, 'w', newline='') as f:
+            header = True
+            while time.monotonic() - file_start < rotate_seconds:
+                window_seconds = batch_seconds * speedup
+                batch = generate_event_batch(
+                    population, activity_rates, utc_offsets, sim_clock, window_seconds,
+                    events_per_sec * batch_seconds, seq, run_tag, rng
+                )
+                batch.to_csv(f, index=False, header=header, date_format='%Y-%m-%d %H:%M:%S.%f')
+                header = False
+                
+                seq += len(batch)
+                file_events += len(batch)
+                sim_clock += timedelta(seconds=window_seconds)
+                
+                next_tick += batch_seconds
+                time.sleep(max(0.0, next_tick - time.monotonic()))
+        
+        tmp_path.rename(final_path)
+        elapsed = time.monotonic() - file_start
+        print(f"  → {final_path.name}: {file_events:,} events ({file_events / elapsed:,.0f} events/sec)")
+    
+    print(f"\n✅ Streamed {seq - 1:,} events in {file_index} files")
+
+
+def generate_batch(output_dir=OUTPUT_DIR):
     print("Generating synthetic SaaS GTM data...")
     
     print("  → Accounts...")
@@ -347,15 +462,15 @@ def main():
     
     # Save to CSV
     print("\nSaving data to CSV...")
-    accounts.to_csv(OUTPUT_DIR / 'accounts.csv', index=False)
-    users.to_csv(OUTPUT_DIR / 'users.csv', index=False)
-    subscriptions.to_csv(OUTPUT_DIR / 'subscriptions.csv', index=False)
-    invoices.to_csv(OUTPUT_DIR / 'invoices.csv', index=False)
-    payments.to_csv(OUTPUT_DIR / 'payments.csv', index=False)
-    crm_deals.to_csv(OUTPUT_DIR / 'crm_deals.csv', index=False)
-    product_events.to_csv(OUTPUT_DIR / 'product_events.csv', index=False)
-    support_tickets.to_csv(OUTPUT_DIR / 'support_tickets.csv', index=False)
-    marketing_spend.to_csv(OUTPUT_DIR / 'marketing_spend.csv', index=False)
+    accounts.to_csv(output_dir / 'accounts.csv', index=False)
+    users.to_csv(output_dir / 'users.csv', index=False)
+    subscriptions.to_csv(output_dir / 'subscriptions.csv', index=False)
+    invoices.to_csv(output_dir / 'invoices.csv', index=False)
+    payments.to_csv(output_dir / 'payments.csv', index=False)
+    crm_deals.to_csv(output_dir / 'crm_deals.csv', index=False)
+    product_events.to_csv(output_dir / 'product_events.csv', index=False)
+    support_tickets.to_csv(output_dir / 'support_tickets.csv', index=False)
+    marketing_spend.to_csv(output_dir / 'marketing_spend.csv', index=False)
     
     print("\n✅ Data generation complete!")
     print(f"\nSummary:")
@@ -370,5 +485,47 @@ def main():
     print(f"  Marketing Spend Records: {len(marketing_spend):,}")
 
 
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic SaaS GTM data')
+    parser.add_argument('--stream', action='store_true',
+                        help='Stream login/feature_use events to rotating files instead of batch CSVs')
+    parser.add_argument('--events-per-sec', type=int, default=500,
+                        help='Target stream throughput (default: 500, ~43M events/day)')
+    parser.add_argument('--duration', type=float, default=None,
+                        help='Seconds to stream for (default: run until interrupted)')
+    parser.add_argument('--rotate-seconds', type=float, default=10,
+                        help='Seconds of streaming per output file')
+    parser.add_argument('--batch-seconds', type=float, default=0.5,
+                        help='Wall-clock seconds per generated batch')
+    parser.add_argument('--speedup', type=float, default=1.0,
+                        help='Simulated seconds per wall-clock second for event timestamps')
+    parser.add_argument('--start', type=datetime.fromisoformat, default=None,
+                        help='Simulated start time (default: now)')
+    parser.add_argument('--tenant', default=None,
+                        help='Tenant ID; writes to output/tenants/<id>/ with a tenant-specific seed')
+    args = parser.parse_args()
+    
+    if args.tenant and args.stream:
+        parser.error("--tenant is only supported for batch generation")
+    
+    if args.stream:
+        try:
+            stream_product_events(
+                args.events_per_sec, args.duration, args.rotate_seconds,
+                args.batch_seconds, args.speedup, args.start or datetime.now()
+            )
+        except KeyboardInterrupt:
+            print("\nStream stopped.")
+    elif args.tenant:
+        # Stable per-tenant seed so each business unit gets its own reproducible book
+        seed_generators(zlib.crc32(args.tenant.encode()))
+        output_dir = OUTPUT_DIR / 'tenants' / args.tenant
+        output_dir.mkdir(parents=True, exist_ok=True)
+        print(f"Tenant: {args.tenant}")
+        generate_batch(output_dir)
+    else:
+        generate_batch()
+
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,144 @@
+{#-
+    Scoped data-quality tests for the large models listed in var('dq_watermarks')
+    (model name -> watermark column).
+
+    dq_mode 'full' (default) tests every row. 'incremental' tests only rows at or
+    after the watermark recorded by the last run in which all of a model's tests
+    passed, plus a dq_sample_pct percent sample of older rows when set.
+    'sampled' tests a dq_sample_pct (default 1) percent sample.
+
+    Watermark columns must survive a reload and be indexed on the underlying
+    table: business dates for batch-loaded tables (typed and indexed by the
+    loader), load times only for append-only streamed ones. Samples read pages
+    through TABLESAMPLE SYSTEM rather than filtering every row.
+-#}
+
+{% macro dq_schema() -%}
+    {{ target.schema }}_dq
+{%- endmacro %}
+
+
+{% macro dq_sampled_relation(relation, sample_pct) %}
+    {#- A TABLESAMPLE SYSTEM read of the relation, so a sample only touches sample_pct of its pages.
+        Views can't be sampled, so a staging view over one raw table is re-selected from the sampled
+        raw table; anything else falls back to a random() filter, which still reads every row. -#}
+    {%- set sample = 'tablesample system (' ~ sample_pct ~ ')' -%}
+    {%- set node = graph.nodes.values() | selectattr('resource_type', 'equalto', 'model')
+                                        | selectattr('alias', 'equalto', relation.identifier) | first -%}
+    {%- if node and node.config.materialized != 'view' -%}
+        {%- do return('(select * from ' ~ relation ~ ' ' ~ sample ~ ')') -%}
+    {%- endif -%}
+
+    {%- set sources = node.depends_on.nodes | select('in', graph.sources) | list if node else [] -%}
+    {%- set refs = node.depends_on.nodes | reject('in', graph.sources) | list if node else [] -%}
+    {%- if sources | length == 1 and not refs -%}
+        {%- set source_node = graph.sources[sources[0]] -%}
+        {%- set source_relation = api.Relation.create(
+            database=source_node.database, schema=source_node.schema, identifier=source_node.identifier) -%}
+        {%- set sql = modules.re.sub('\\{\\{\\s*source\\([^)]*\\)\\s*\\}\\}', source_relation ~ ' ' ~ sample, node.raw_code) -%}
+        {%- if '{{' not in sql and '{%' not in sql -%}
+            {%- do return('(' ~ sql ~ '\n)') -%}
+        {%- endif -%}
+    {%- endif -%}
+    {%- do return('(select * from ' ~ relation ~ ' where random() < ' ~ sample_pct / 100 ~ ')') -%}
+{% endmacro %}
+
+
+{% macro dq_scope(relation) -%}
+    {#- Scoped relation for a test, as a subquery callers alias, or the relation itself to test every row -#}
+    {%- set mode = var('dq_mode', 'full') -%}
+    {%- set sample_pct = var('dq_sample_pct', 0) | float -%}
+    {%- set watermark_column = var('dq_watermarks', {}).get(relation.identifier) -%}
+
+    {%- if mode not in ('full', 'incremental', 'sampled') -%}
+        {{ exceptions.raise_compiler_error("Unknown dq_mode '" ~ mode ~ "'; expected full, incremental or sampled") }}
+    {%- elif mode == 'full' or not watermark_column -%}
+        {%- do return(relation) -%}
+    {%- elif mode == 'sampled' -%}
+        {%- do return(dq_sampled_relation(relation, sample_pct if sample_pct > 0 else 1)) -%}
+    {%- endif -%}
+
+    {#- Watermark columns are indexed, so only the new rows are read -#}
+    {%- set new_rows -%}
+        {{ watermark_column }} >= coalesce(
+            (select watermark from {{ dq_schema() }}.dq_watermarks where model_name = '{{ relation.identifier }}'),
+            '-infinity'
+        )
+    {%- endset -%}
+    {%- if sample_pct > 0 -%}
+        {%- do return('(select * from ' ~ relation ~ ' where ' ~ new_rows ~ ' union all select * from '
+                      ~ dq_sampled_relation(relation, sample_pct) ~ ' dq_sample where (' ~ new_rows ~ ') is not true)') -%}
+    {%- endif -%}
+    {%- do return('(select * from ' ~ relation ~ ' where ' ~ new_rows ~ ')') -%}
+{%- endmacro %}
+
+
+{% macro get_where_subquery(relation) -%}
+    {#- Overrides dbt's built-in so generic tests combine their where config with dq scoping -#}
+    {%- set where = config.get('where', '') -%}
+    {%- set scoped = dq_scope(relation) -%}
+
+    {%- if where -%}
+        {%- do return('(select * from ' ~ scoped ~ ' dq_scope where ' ~ where ~ ') dbt_subquery') -%}
+    {%- elif scoped is string -%}
+        {%- do return(scoped ~ ' dbt_subquery') -%}
+    {%- endif -%}
+    {%- do return(relation) -%}
+{%- endmacro %}
+
+
+{% macro dq_capture_watermarks() %}
+    {#- on-run-start: note each model's current high watermark before tests run -#}
+    {% if execute and flags.WHICH in ('test', 'build') and var('dq_mode', 'full') == 'incremental' %}
+        create schema if not exists {{ dq_schema() }};
+        create table if not exists {{ dq_schema() }}.dq_watermarks (
+            model_name text primary key,
+            watermark timestamp not null,
+            updated_at timestamp not null default now()
+        );
+        create table if not exists {{ dq_schema() }}.dq_watermark_candidates (
+            invocation_id text not null,
+            model_name text not null,
+            watermark timestamp,
+            primary key (invocation_id, model_name)
+        );
+        {% set watermarks = var('dq_watermarks', {}) %}
+        {% for node in graph.nodes.values() if node.resource_type == 'model' and node.name in watermarks %}
+            {% set relation = api.Relation.create(database=node.database, schema=node.schema, identifier=node.alias) %}
+            insert into {{ dq_schema() }}.dq_watermark_candidates (invocation_id, model_name, watermark)
+            select '{{ invocation_id }}', '{{ node.name }}', max({{ watermarks[node.name] }})
+            from {{ relation }};
+        {% endfor %}
+    {% endif %}
+{% endmacro %}
+
+
+{% macro dq_promote_watermarks(results) %}
+    {#- on-run-end: advance the watermark of every tested model whose tests all passed -#}
+    {% if execute and flags.WHICH in ('test', 'build') and var('dq_mode', 'full') == 'incremental' %}
+        {% set tested = [] %}
+        {% set failed = [] %}
+        {% for result in results if result.node.resource_type == 'test' %}
+            {% for upstream in result.node.depends_on.nodes %}
+                {% do tested.append(upstream.split('.')[-1]) %}
+                {% if result.status != 'pass' %}
+                    {% do failed.append(upstream.split('.')[-1]) %}
+                {% endif %}
+            {% endfor %}
+        {% endfor %}
+        {% set passed = tested | reject('in', failed) | unique | list %}
+
+        {% if passed %}
+            insert into {{ dq_schema() }}.dq_watermarks (model_name, watermark, updated_at)
+            select model_name, watermark, now()
+            from {{ dq_schema() }}.dq_watermark_candidates
+            where invocation_id = '{{ invocation_id }}'
+              and watermark is not null
+              and model_name in ('{{ passed | join("', '") }}')
+            on conflict (model_name) do update
+                set watermark = excluded.watermark,
+                    updated_at = excluded.updated_at;
+        {% endif %}
+        delete from {{ dq_schema() }}.dq_watermark_candidates where invocation_id = '{{ invocation_id }}';
+    {% endif %}
+{% endmacro %}
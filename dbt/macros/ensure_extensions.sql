@@ -0,0 +1,15 @@
+{% macro ensure_extensions() %}
+    {#- on-run-start: create database-wide extensions once. Tenant builds run dbt in parallel against
+        shared databases, and concurrent CREATE EXTENSION IF NOT EXISTS can race on pg_extension's
+        unique index, so creation is serialised on an advisory lock and skipped once present. -#}
+    {% if execute and flags.WHICH in ('run', 'build') %}
+        do $$
+        begin
+            if not exists (select 1 from pg_extension where extname = 'btree_gist') then
+                perform pg_advisory_xact_lock(hashtext('create extension btree_gist'));
+                create extension if not exists btree_gist;
+            end if;
+        end
+        $$;
+    {% endif %}
+{% endmacro %}
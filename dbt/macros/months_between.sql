@@ -0,0 +1,6 @@
+{% macro months_between(start_month, end_month) -%}
+    (
+        (extract(year from {{ end_month }}) - extract(year from {{ start_month }})) * 12
+        + (extract(month from {{ end_month }}) - extract(month from {{ start_month }}))
+    )::int
+{%- endmacro %}
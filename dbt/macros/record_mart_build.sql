@@ -0,0 +1,33 @@
+{% macro record_mart_build(results) %}
+    {#- Stamps each dbt run, and every model it rebuilt, so downstream caches can tell which marts changed -#}
+    {% if execute and flags.WHICH in ('run', 'build') %}
+        create schema if not exists {{ target.schema }}_marts;
+        create table if not exists {{ target.schema }}_marts.mart_builds (
+            invocation_id text primary key,
+            built_at timestamp not null default now()
+        );
+        insert into {{ target.schema }}_marts.mart_builds (invocation_id)
+        values ('{{ invocation_id }}')
+        on conflict (invocation_id) do nothing;
+
+        create table if not exists {{ target.schema }}_marts.mart_model_builds (
+            model_name text primary key,
+            invocation_id text not null,
+            built_at timestamp not null default now()
+        );
+        {% set built = [] %}
+        {% for result in results if result.node.resource_type == 'model' and result.status == 'success' %}
+            {% do built.append(result.node.name) %}
+        {% endfor %}
+        {% if built %}
+            insert into {{ target.schema }}_marts.mart_model_builds (model_name, invocation_id)
+            values
+            {%- for name in built %}
+                ('{{ name }}', '{{ invocation_id }}'){{ ',' if not loop.last }}
+            {%- endfor %}
+            on conflict (model_name) do update
+                set invocation_id = excluded.invocation_id,
+                    built_at = now();
+        {% endif %}
+    {% endif %}
+{% endmacro %}
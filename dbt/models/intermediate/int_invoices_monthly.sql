@@ -0,0 +1,21 @@
+{{
+    config(
+        indexes=[
+            {'columns': ['account_id', 'invoice_month'], 'unique': True},
+            {'columns': ['invoice_month']}
+        ]
+    )
+}}
+
+-- Paid invoices rolled up to the account-month grain. Revenue, retention and
+-- CAC marts read this instead of scanning stg_invoices and grouping on
+-- date_trunc themselves, so their joins are plain equality lookups.
+
+select
+    account_id,
+    date_trunc('month', invoice_date)::date as invoice_month,
+    sum(amount) as paid_amount,
+    count(*) as invoice_count
+from {{ ref('stg_invoices') }}
+where status = 'Paid'
+group by 1, 2
@@ -0,0 +1,54 @@
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='delete+insert',
+        unique_key='user_id',
+        indexes=[
+            {'columns': ['user_id'], 'unique': True},
+            {'columns': ['account_id']}
+        ]
+    )
+}}
+
+-- One row per user summarising product events. Incremental runs only read
+-- events loaded since the last build and fold them into the existing rows.
+-- Every aggregate is a min/max, so re-reading an event never changes the result.
+
+with new_events as (
+    select
+        user_id,
+        account_id,
+        event_type,
+        event_timestamp,
+        loaded_at
+    from {{ ref('stg_product_events') }}
+    {% if is_incremental() %}
+    where loaded_at > (select max(last_loaded_at) from {{ this }})
+    {% endif %}
+),
+
+batch as (
+    select
+        user_id,
+        max(account_id) as account_id,
+        min(event_timestamp) filter (where event_type = 'activation') as activation_timestamp,
+        min(event_timestamp) as first_event_at,
+        max(event_timestamp) as last_event_at,
+        max(loaded_at) as last_loaded_at
+    from new_events
+    group by 1
+)
+
+{% if is_incremental() %}
+select
+    b.user_id,
+    b.account_id,
+    least(b.activation_timestamp, t.activation_timestamp) as activation_timestamp,
+    least(b.first_event_at, t.first_event_at) as first_event_at,
+    greatest(b.last_event_at, t.last_event_at) as last_event_at,
+    greatest(b.last_loaded_at, t.last_loaded_at) as last_loaded_at
+from batch b
+left join {{ this }} t on b.user_id = t.user_id
+{% else %}
+select * from batch
+{% endif %}
@@ -1,3 +1,14 @@
+with current_subscriptions as (
+    -- One subscription per account: an active one if any, else the most recently started
+    select distinct on (account_id)
+        account_id,
+        plan_tier,
+        start_date,
+        status
+    from {{ ref('stg_subscriptions') }}
+    order by account_id, (status = 'Active') desc, start_date desc, subscription_id desc
+)
+
 select
     a.account_id,
     a.account_name,
@@ -14,5 +25,5 @@ select
         else 0
     end as is_active_subscriber
 from {{ ref('stg_accounts') }} a
-left join {{ ref('stg_subscriptions') }} s
+left join current_subscriptions s
     on a.account_id = s.account_id
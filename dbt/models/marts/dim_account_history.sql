@@ -0,0 +1,165 @@
+{{
+    config(
+        post_hook=after_commit(
+            "alter table {{ this }} add constraint {{ this.identifier }}__no_overlap
+             exclude using gist (account_id with =, valid_during with &&)"
+        )
+    )
+}}
+
+-- Effective-dated account attributes merged from the account and subscription snapshots.
+-- Versions of one account never overlap (enforced by the exclusion constraint, whose GiST
+-- index also serves as-of joins), so a fact joined on
+--   da.account_id = f.account_id and da.valid_during @> <point in time>
+-- matches at most one row.
+
+with account_versions as (
+    select
+        account_id,
+        segment,
+        company_size,
+        region,
+        acquisition_channel,
+        status as account_status,
+        -- Snapshots only see changes from their first run on; backdate the first version
+        case
+            when row_number() over (partition by account_id order by dbt_valid_from) = 1
+                then least(created_at, dbt_valid_from)
+            else dbt_valid_from
+        end as valid_from,
+        dbt_valid_to as valid_to
+    from {{ ref('snap_accounts') }}
+),
+
+subscription_versions as (
+    select
+        subscription_id,
+        account_id,
+        plan_tier,
+        start_date,
+        end_date,
+        case
+            when row_number() over (partition by subscription_id order by dbt_valid_from) = 1
+                then least(start_date::timestamp, dbt_valid_from)
+            else dbt_valid_from
+        end as valid_from,
+        dbt_valid_to as valid_to
+    from {{ ref('snap_subscriptions') }}
+),
+
+change_points as (
+    -- Every instant at which any attribute of an account can change
+    select account_id, valid_from as changed_at from account_versions
+    union
+    select account_id, valid_to from account_versions where valid_to is not null
+    union
+    select account_id, valid_from from subscription_versions
+    union
+    select account_id, valid_to from subscription_versions where valid_to is not null
+    union
+    select account_id, start_date::timestamp from subscription_versions
+    union
+    select account_id, (end_date + 1)::timestamp from subscription_versions where end_date is not null
+),
+
+intervals as (
+    select
+        account_id,
+        changed_at as valid_from,
+        lead(changed_at) over (partition by account_id order by changed_at) as valid_to
+    from change_points
+),
+
+interval_attributes as (
+    select
+        i.account_id,
+        i.valid_from,
+        i.valid_to,
+        a.segment,
+        a.company_size,
+        a.region,
+        a.acquisition_channel,
+        a.account_status,
+        s.subscription_id,
+        s.plan_tier,
+        case when s.is_active then 1 else 0 end as is_active_subscriber
+    from intervals i
+    -- Intervals outside every account version (after a hard delete) drop out here
+    join account_versions a
+        on a.account_id = i.account_id
+        and i.valid_from >= a.valid_from
+        and (a.valid_to is null or i.valid_from < a.valid_to)
+    left join lateral (
+        -- The subscription in force: an active one if any, else the most recently started
+        select
+            sv.subscription_id,
+            sv.plan_tier,
+            sv.end_date is null or i.valid_from < sv.end_date + 1 as is_active
+        from subscription_versions sv
+        where sv.account_id = i.account_id
+          and i.valid_from >= sv.valid_from
+          and (sv.valid_to is null or i.valid_from < sv.valid_to)
+          and sv.start_date <= i.valid_from
+        order by is_active desc, sv.start_date desc, sv.subscription_id desc
+        limit 1
+    ) s on true
+),
+
+flagged as (
+    -- Adjacent intervals with identical attributes belong to the same version
+    select
+        *,
+        case
+            when md5(concat_ws('|', segment, company_size, region, acquisition_channel, account_status,
+                               subscription_id, plan_tier, is_active_subscriber))
+                 = lag(md5(concat_ws('|', segment, company_size, region, acquisition_channel, account_status,
+                                     subscription_id, plan_tier, is_active_subscriber))) over w
+             and valid_from = lag(valid_to) over w
+            then 0
+            else 1
+        end as is_new_version
+    from interval_attributes
+    window w as (partition by account_id order by valid_from)
+),
+
+versions as (
+    select
+        *,
+        sum(is_new_version) over (partition by account_id order by valid_from) as version_number
+    from flagged
+),
+
+collapsed as (
+    select
+        account_id,
+        version_number,
+        segment,
+        company_size,
+        region,
+        acquisition_channel,
+        account_status,
+        subscription_id,
+        plan_tier,
+        is_active_subscriber,
+        min(valid_from) as valid_from,
+        (array_agg(valid_to order by valid_from desc))[1] as valid_to
+    from versions
+    group by 1, 2, 3, 4, 5, 6, 7, 8, 9, 10
+)
+
+select
+    account_id,
+    version_number,
+    segment,
+    company_size,
+    region,
+    acquisition_channel,
+    account_status,
+    subscription_id,
+    plan_tier,
+    is_active_subscriber,
+    valid_from,
+    valid_to,
+    tsrange(valid_from, valid_to, '[)') as valid_during,
+    valid_to is null as is_current
+from collapsed
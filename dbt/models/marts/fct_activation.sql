@@ -3,11 +3,11 @@ with user_activation as (
         u.user_id,
         u.account_id,
         u.created_at as user_created_at,
-        min(e.event_timestamp) filter (where e.event_type = 'activation') as activation_timestamp
+        ua.activation_timestamp,
+        ua.last_event_at
     from {{ ref('stg_users') }} u
-    left join {{ ref('stg_product_events') }} e
-        on u.user_id = e.user_id
-    group by 1, 2, 3
+    left join {{ ref('int_user_activity') }} ua
+        on u.user_id = ua.user_id
 ),
 
 activation_metrics as (
@@ -19,7 +19,8 @@ activation_metrics as (
             count(activation_timestamp)::numeric / nullif(count(*), 0),
             3
         ) as activation_rate,
-        percentile_cont(0.5) within group (order by extract(epoch from (activation_timestamp - user_created_at)) / 86400) as median_days_to_activate
+        percentile_cont(0.5) within group (order by extract(epoch from (activation_timestamp - user_created_at)) / 86400) as median_days_to_activate,
+        max(last_event_at) as last_event_at
     from user_activation
     group by 1
 )
@@ -31,6 +32,7 @@ select
     a.total_users,
     a.activated_users,
     a.activation_rate,
-    round(a.median_days_to_activate::numeric, 1) as median_days_to_activate
+    round(a.median_days_to_activate::numeric, 1) as median_days_to_activate,
+    a.last_event_at
 from activation_metrics a
 join {{ ref('dim_account') }} da on a.account_id = da.account_id
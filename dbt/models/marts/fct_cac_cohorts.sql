@@ -0,0 +1,52 @@
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='delete+insert',
+        unique_key=['channel', 'cohort_month']
+    )
+}}
+
+-- Marketing spend matched to the accounts acquired in the same month and
+-- channel. A closed month's spend and acquisitions never change, so
+-- incremental runs only rebuild the newest cohort month.
+
+with cohort_accounts as (
+    select
+        acquisition_channel as channel,
+        date_trunc('month', created_at)::date as cohort_month,
+        count(*) as accounts_acquired
+    from {{ ref('stg_accounts') }}
+    {% if is_incremental() %}
+    where created_at >= (select max(cohort_month) from {{ this }})
+    {% endif %}
+    group by 1, 2
+),
+
+monthly_spend as (
+    select
+        channel,
+        month as cohort_month,
+        sum(spend) as spend,
+        sum(leads_generated) as leads_generated
+    from {{ ref('stg_marketing_spend') }}
+    {% if is_incremental() %}
+    where month >= (select max(cohort_month) from {{ this }})
+    {% endif %}
+    group by 1, 2
+)
+
+select
+    coalesce(ms.channel, ca.channel) as channel,
+    coalesce(ms.cohort_month, ca.cohort_month) as cohort_month,
+    coalesce(ms.spend, 0) as spend,
+    coalesce(ms.leads_generated, 0) as leads_generated,
+    coalesce(ca.accounts_acquired, 0) as accounts_acquired,
+    case
+        when ca.accounts_acquired > 0
+        then round((ms.spend / ca.accounts_acquired)::numeric, 2)
+        else null
+    end as cac
+from monthly_spend ms
+full outer join cohort_accounts ca
+    on ms.channel = ca.channel
+    and ms.cohort_month = ca.cohort_month
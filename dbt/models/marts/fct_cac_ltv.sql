@@ -1,67 +1,84 @@
-with channel_spend as (
+with channel_cohorts as (
     select
-        ms.channel,
-        sum(ms.spend) as total_spend,
-        sum(ms.leads_generated) as total_leads
-    from {{ ref('stg_marketing_spend') }} ms
+        channel,
+        sum(spend) as total_spend,
+        sum(leads_generated) as total_leads,
+        sum(accounts_acquired) as accounts_acquired
+    from {{ ref('fct_cac_cohorts') }}
     group by 1
 ),
 
-channel_attribution as (
+channel_revenue as (
     select
-        a.acquisition_channel,
-        count(*) as accounts_acquired,
-        sum(i.amount) as total_revenue
+        a.acquisition_channel as channel,
+        sum(i.paid_amount) as total_revenue
     from {{ ref('stg_accounts') }} a
-    left join {{ ref('stg_invoices') }} i on a.account_id = i.account_id
-    where i.status = 'Paid'
+    join {{ ref('int_invoices_monthly') }} i on a.account_id = i.account_id
+    group by 1
+),
+
+channel_ltv as (
+    select
+        channel,
+        max(cumulative_revenue_per_account) as ltv
+    from {{ ref('fct_ltv_curves') }}
     group by 1
 ),
 
 cac_calc as (
     select
-        cs.channel,
-        cs.total_spend,
-        cs.total_leads,
-        coalesce(ca.accounts_acquired, 0) as accounts_acquired,
-        coalesce(ca.total_revenue, 0) as total_revenue,
+        cc.channel,
+        cc.total_spend,
+        cc.total_leads,
+        cc.accounts_acquired,
+        coalesce(cr.total_revenue, 0) as total_revenue,
+        cl.ltv,
         case
-            when ca.accounts_acquired > 0 
-            then round((cs.total_spend / ca.accounts_acquired)::numeric, 2)
+            when cc.accounts_acquired > 0 
+            then round((cc.total_spend / cc.accounts_acquired)::numeric, 2)
             else null
         end as cac,
         case
-            when ca.accounts_acquired > 0 
-            then round((ca.total_revenue / ca.accounts_acquired)::numeric, 2)
+            when cc.accounts_acquired > 0 
+            then round((cr.total_revenue / cc.accounts_acquired)::numeric, 2)
             else null
         end as revenue_per_customer,
         case
-            when cs.total_spend > 0 
-            then round((ca.total_revenue / cs.total_spend)::numeric, 2)
-            else null
-        end as roas,
-        case
-            when ca.accounts_acquired > 0 and cs.total_spend > 0
-            then round(((ca.total_revenue / ca.accounts_acquired) / (cs.total_spend / ca.accounts_acquired))::numeric, 1)
+            when cc.total_spend > 0 
+            then round((cr.total_revenue / cc.total_spend)::numeric, 2)
             else null
-        end as ltv_cac_ratio
-    from channel_spend cs
-    left join channel_attribution ca on cs.channel = ca.acquisition_channel
+        end as roas
+    from channel_cohorts cc
+    left join channel_revenue cr on cc.channel = cr.channel
+    left join channel_ltv cl on cc.channel = cl.channel
+),
+
+payback as (
+    select
+        c.channel,
+        min(l.months_since_acquisition) + 1 as cac_payback_months
+    from cac_calc c
+    join {{ ref('fct_ltv_curves') }} l
+        on c.channel = l.channel
+        and l.cumulative_revenue_per_account >= c.cac
+    group by 1
 )
 
 select
-    channel,
-    total_spend,
-    total_leads,
-    accounts_acquired,
-    total_revenue,
-    cac,
-    revenue_per_customer as rough_ltv,
-    roas,
-    ltv_cac_ratio,
+    c.channel,
+    c.total_spend,
+    c.total_leads,
+    c.accounts_acquired,
+    c.total_revenue,
+    c.cac,
+    c.revenue_per_customer,
+    c.ltv,
+    c.roas,
     case
-        when cac > 0 and revenue_per_customer > 0
-        then round(((cac / (revenue_per_customer * 0.05)))::numeric, 1)
+        when c.cac > 0
+        then round((c.ltv / c.cac)::numeric, 1)
         else null
-    end as cac_payback_months
-from cac_calc
+    end as ltv_cac_ratio,
+    p.cac_payback_months
+from cac_calc c
+left join payback p on c.channel = p.channel
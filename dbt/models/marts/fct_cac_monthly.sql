@@ -0,0 +1,40 @@
+with channel_ltv as (
+    select
+        channel,
+        max(cumulative_revenue_per_account) as ltv
+    from {{ ref('fct_ltv_curves') }}
+    group by 1
+),
+
+payback as (
+    -- First month in which expected cumulative revenue per account covers CAC
+    select
+        c.channel,
+        c.cohort_month,
+        min(l.months_since_acquisition) + 1 as cac_payback_months
+    from {{ ref('fct_cac_cohorts') }} c
+    join {{ ref('fct_ltv_curves') }} l
+        on c.channel = l.channel
+        and l.cumulative_revenue_per_account >= c.cac
+    group by 1, 2
+)
+
+select
+    c.channel,
+    c.cohort_month,
+    c.spend,
+    c.leads_generated,
+    c.accounts_acquired,
+    c.cac,
+    cl.ltv,
+    case
+        when c.cac > 0
+        then round((cl.ltv / c.cac)::numeric, 1)
+        else null
+    end as ltv_cac_ratio,
+    p.cac_payback_months
+from {{ ref('fct_cac_cohorts') }} c
+left join channel_ltv cl on c.channel = cl.channel
+left join payback p
+    on c.channel = p.channel
+    and c.cohort_month = p.cohort_month
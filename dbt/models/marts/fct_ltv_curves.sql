@@ -0,0 +1,81 @@
+{% set horizon = var('ltv_horizon_months', 36) %}
+{% set gross_margin = var('ltv_gross_margin', 1.0) %}
+
+-- Expected revenue per acquired account by months since acquisition. Observed
+-- survival comes from the cohort retention grid; ages no cohort has reached
+-- yet are extrapolated with the channel's geometric monthly retention.
+
+with observed as (
+    select
+        acquisition_channel as channel,
+        months_since_cohort,
+        sum(active_accounts)::numeric / nullif(sum(cohort_size), 0) as survival_rate,
+        sum(active_accounts) as active_accounts,
+        sum(cohort_revenue) as cohort_revenue
+    from {{ ref('fct_retention_cohorts') }}
+    group by 1, 2
+),
+
+channel_fit as (
+    select
+        channel,
+        max(months_since_cohort) as max_observed_age,
+        sum(cohort_revenue) / nullif(sum(active_accounts), 0) as arpa,
+        max(survival_rate) filter (where months_since_cohort = 1) as first_survival
+    from observed
+    group by 1
+),
+
+tail_fit as (
+    -- Month 0 is a partial billing month, so the fit starts at month 1
+    select
+        cf.channel,
+        cf.max_observed_age,
+        cf.arpa,
+        o.survival_rate as tail_survival,
+        case
+            when cf.max_observed_age > 1 and cf.first_survival > 0
+            then least(power(o.survival_rate / cf.first_survival, 1.0 / (cf.max_observed_age - 1)), 1)
+            else 1
+        end as monthly_retention
+    from channel_fit cf
+    join observed o
+        on cf.channel = o.channel
+        and cf.max_observed_age = o.months_since_cohort
+),
+
+ages as (
+    select generate_series(0, {{ horizon }} - 1) as months_since_acquisition
+),
+
+curve as (
+    select
+        tf.channel,
+        a.months_since_acquisition,
+        a.months_since_acquisition > tf.max_observed_age as is_extrapolated,
+        case
+            when a.months_since_acquisition <= tf.max_observed_age then coalesce(o.survival_rate, 0)
+            else tf.tail_survival * power(tf.monthly_retention, a.months_since_acquisition - tf.max_observed_age)
+        end as survival_rate,
+        tf.arpa
+    from tail_fit tf
+    cross join ages a
+    left join observed o
+        on tf.channel = o.channel
+        and a.months_since_acquisition = o.months_since_cohort
+)
+
+select
+    channel,
+    months_since_acquisition,
+    is_extrapolated,
+    round(survival_rate, 4) as survival_rate,
+    round((arpa * survival_rate * {{ gross_margin }})::numeric, 2) as expected_revenue_per_account,
+    round(
+        (sum(arpa * survival_rate * {{ gross_margin }}) over (
+            partition by channel
+            order by months_since_acquisition
+        ))::numeric,
+        2
+    ) as cumulative_revenue_per_account
+from curve
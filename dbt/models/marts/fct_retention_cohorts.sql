@@ -0,0 +1,92 @@
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='delete+insert',
+        unique_key=['cohort_month', 'activity_month', 'segment', 'region', 'acquisition_channel'],
+        indexes=[
+            {'columns': ['activity_month']},
+            {'columns': ['cohort_month', 'months_since_cohort']}
+        ]
+    )
+}}
+
+-- Dense cohort x age grid at the finest filter grain. Every account belongs to
+-- exactly one (segment, region, channel) slice, so active_accounts is additive
+-- and any filtered view is a plain sum instead of a count(distinct).
+
+with account_cohorts as (
+    select
+        account_id,
+        segment,
+        region,
+        acquisition_channel,
+        date_trunc('month', created_at)::date as cohort_month
+    from {{ ref('stg_accounts') }}
+),
+
+cohort_sizes as (
+    select
+        cohort_month,
+        segment,
+        region,
+        acquisition_channel,
+        count(*) as cohort_size
+    from account_cohorts
+    group by 1, 2, 3, 4
+),
+
+account_activity as (
+    -- One row per account and month, so count(*) downstream is a distinct count
+    select
+        i.account_id,
+        i.invoice_month as activity_month,
+        i.paid_amount as revenue
+    from {{ ref('int_invoices_monthly') }} i
+    {% if is_incremental() %}
+    where i.invoice_month >= (select max(activity_month) from {{ this }})
+    {% endif %}
+),
+
+activity_months as (
+    select
+        d.date as activity_month
+    from {{ ref('dim_date') }} d
+    where d.day = 1
+      and d.date <= (select max(activity_month) from account_activity)
+    {% if is_incremental() %}
+      and d.date >= (select max(activity_month) from {{ this }})
+    {% endif %}
+),
+
+cohort_activity as (
+    select
+        ac.cohort_month,
+        ac.segment,
+        ac.region,
+        ac.acquisition_channel,
+        aa.activity_month,
+        count(*) as active_accounts,
+        sum(aa.revenue) as cohort_revenue
+    from account_activity aa
+    join account_cohorts ac on aa.account_id = ac.account_id
+    group by 1, 2, 3, 4, 5
+)
+
+select
+    cs.cohort_month,
+    am.activity_month,
+    {{ months_between('cs.cohort_month', 'am.activity_month') }} as months_since_cohort,
+    cs.segment,
+    cs.region,
+    cs.acquisition_channel,
+    cs.cohort_size,
+    coalesce(ca.active_accounts, 0) as active_accounts,
+    coalesce(ca.cohort_revenue, 0) as cohort_revenue
+from cohort_sizes cs
+join activity_months am on am.activity_month >= cs.cohort_month
+left join cohort_activity ca
+    on cs.cohort_month = ca.cohort_month
+    and cs.segment = ca.segment
+    and cs.region = ca.region
+    and cs.acquisition_channel = ca.acquisition_channel
+    and am.activity_month = ca.activity_month
@@ -0,0 +1,70 @@
+{% set max_age = var('retention_max_age', 12) %}
+
+-- Ready-to-plot cohort x age matrix for every segment/region/channel filter
+-- combination ('All' marks a rolled-up dimension). Each row is one heatmap row.
+
+with sliced as (
+    select
+        cohort_month,
+        months_since_cohort,
+        case when grouping(segment) = 1 then 'All' else segment end as segment,
+        case when grouping(region) = 1 then 'All' else region end as region,
+        case when grouping(acquisition_channel) = 1 then 'All' else acquisition_channel end as acquisition_channel,
+        sum(cohort_size) as cohort_size,
+        sum(active_accounts) as active_accounts,
+        sum(cohort_revenue) as cohort_revenue
+    from {{ ref('fct_retention_cohorts') }}
+    where months_since_cohort <= {{ max_age }}
+    group by cohort_month, months_since_cohort, cube(segment, region, acquisition_channel)
+),
+
+slices as (
+    select
+        cohort_month,
+        segment,
+        region,
+        acquisition_channel,
+        max(cohort_size) as cohort_size
+    from sliced
+    group by 1, 2, 3, 4
+),
+
+ages as (
+    select generate_series(0, {{ max_age }}) as months_since_cohort
+),
+
+dense as (
+    -- Ages a cohort has not reached yet stay null so the heatmap leaves them blank
+    select
+        s.cohort_month,
+        s.segment,
+        s.region,
+        s.acquisition_channel,
+        s.cohort_size,
+        a.months_since_cohort,
+        sl.active_accounts,
+        sl.cohort_revenue
+    from slices s
+    cross join ages a
+    left join sliced sl
+        on s.cohort_month = sl.cohort_month
+        and s.segment = sl.segment
+        and s.region = sl.region
+        and s.acquisition_channel = sl.acquisition_channel
+        and a.months_since_cohort = sl.months_since_cohort
+)
+
+select
+    cohort_month,
+    segment,
+    region,
+    acquisition_channel,
+    cohort_size,
+    array_agg(active_accounts order by months_since_cohort) as active_accounts_by_age,
+    array_agg(cohort_revenue order by months_since_cohort) as revenue_by_age,
+    array_agg(
+        round(100.0 * active_accounts / nullif(cohort_size, 0), 1)
+        order by months_since_cohort
+    ) as retention_pct_by_age
+from dense
+group by 1, 2, 3, 4, 5
@@ -1,3 +1,5 @@
+{{ config(indexes=[{'columns': ['revenue_month']}]) }}
+
 with subscription_months as (
     -- Create a row for each subscription for each month it was active or should have been
     select
@@ -12,21 +14,29 @@ with subscription_months as (
       and d.day = 1
 ),
 
-monthly_revenue as (
+account_months as (
+    -- Collapse overlapping subscriptions so each account-month joins invoices once
     select
-        sm.account_id,
-        sm.revenue_month,
-        coalesce(sum(i.amount), 0) as mrr,
-        count(distinct i.invoice_id) as invoice_count,
-        max(sm.end_date) as subscription_end_date
-    from subscription_months sm
-    left join {{ ref('stg_invoices') }} i 
-        on sm.account_id = i.account_id
-        and date_trunc('month', i.invoice_date)::date = sm.revenue_month
-        and i.status = 'Paid'
+        account_id,
+        revenue_month,
+        max(end_date) as subscription_end_date
+    from subscription_months
     group by 1, 2
 ),
 
+monthly_revenue as (
+    select
+        am.account_id,
+        am.revenue_month,
+        coalesce(i.paid_amount, 0) as mrr,
+        coalesce(i.invoice_count, 0) as invoice_count,
+        am.subscription_end_date
+    from account_months am
+    left join {{ ref('int_invoices_monthly') }} i
+        on am.account_id = i.account_id
+        and am.revenue_month = i.invoice_month
+),
+
 revenue_with_lag as (
     select
         account_id,
@@ -0,0 +1,14 @@
+{{ config(indexes=[{'columns': ['ticket_month']}]) }}
+
+-- Additive ticket counts per account and month, for slicing by the attributes in force that month
+select
+    date_trunc('month', t.created_at)::date as ticket_month,
+    t.account_id,
+    count(*) as total_tickets,
+    count(*) filter (where t.severity = 'Critical') as critical_tickets,
+    count(*) filter (where t.severity = 'High') as high_tickets,
+    count(*) filter (where t.sla_breached = true) as sla_breached_tickets,
+    count(t.resolution_hours) as resolved_tickets,
+    sum(t.resolution_hours) as total_resolution_hours
+from {{ ref('stg_support_tickets') }} t
+group by 1, 2
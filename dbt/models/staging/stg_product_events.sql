@@ -3,5 +3,6 @@ select
     user_id,
     account_id,
     event_type,
-    event_timestamp::timestamp as event_timestamp
+    event_timestamp::timestamp as event_timestamp,
+    _loaded_at::timestamp as loaded_at
 from {{ source('raw', 'raw_product_events') }}
@@ -0,0 +1,25 @@
+{% snapshot snap_accounts %}
+
+{{
+    config(
+        target_schema=target.schema ~ '_snapshots',
+        unique_key='account_id',
+        strategy='check',
+        check_cols=['segment', 'company_size', 'region', 'acquisition_channel', 'status'],
+        invalidate_hard_deletes=True,
+    )
+}}
+
+-- Reads the raw table so snapshots can run before the staging views exist
+select
+    account_id,
+    account_name,
+    segment,
+    company_size,
+    region,
+    acquisition_channel,
+    created_at::timestamp as created_at,
+    status
+from {{ source('raw', 'raw_accounts') }}
+
+{% endsnapshot %}
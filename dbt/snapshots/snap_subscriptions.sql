@@ -0,0 +1,23 @@
+{% snapshot snap_subscriptions %}
+
+{{
+    config(
+        target_schema=target.schema ~ '_snapshots',
+        unique_key='subscription_id',
+        strategy='check',
+        check_cols=['account_id', 'plan_tier', 'start_date', 'end_date', 'status'],
+        invalidate_hard_deletes=True,
+    )
+}}
+
+-- Reads the raw table so snapshots can run before the staging views exist
+select
+    subscription_id,
+    account_id,
+    plan_tier,
+    start_date::date as start_date,
+    end_date::date as end_date,
+    status
+from {{ source('raw', 'raw_subscriptions') }}
+
+{% endsnapshot %}
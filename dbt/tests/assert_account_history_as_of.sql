@@ -0,0 +1,11 @@
+-- Every monthly revenue row must find exactly one account version in force at the end of its month
+select
+    r.account_id,
+    r.revenue_month,
+    count(h.account_id) as matching_versions
+from {{ dq_scope(ref('fct_revenue_monthly')) }} r
+left join {{ ref('dim_account_history') }} h
+    on h.account_id = r.account_id
+    and h.valid_during @> (r.revenue_month + interval '1 month' - interval '1 microsecond')
+group by 1, 2
+having count(h.account_id) <> 1
@@ -3,7 +3,7 @@ select
     account_id,
     invoice_date,
     amount
-from {{ ref('stg_invoices') }}
+from {{ dq_scope(ref('stg_invoices')) }} invoices
 where amount < 0
 
 union all
@@ -13,5 +13,5 @@ select
     account_id,
     revenue_month as invoice_date,
     mrr as amount
-from {{ ref('fct_revenue_monthly') }}
+from {{ dq_scope(ref('fct_revenue_monthly')) }} revenue
 where mrr < 0
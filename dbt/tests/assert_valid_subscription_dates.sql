@@ -4,7 +4,7 @@ with invalid_subscription_dates as (
         account_id,
         start_date,
         end_date
-    from {{ ref('stg_subscriptions') }}
+    from {{ dq_scope(ref('stg_subscriptions')) }} subscriptions
     where end_date is not null
       and start_date > end_date
 ),
@@ -16,7 +16,7 @@ invalid_invoice_dates as (
         i.invoice_date,
         s.start_date,
         s.end_date
-    from {{ ref('stg_invoices') }} i
+    from {{ dq_scope(ref('stg_invoices')) }} i
     join {{ ref('stg_subscriptions') }} s on i.subscription_id = s.subscription_id
     where i.invoice_date < s.start_date
        or (s.end_date is not null and i.invoice_date > s.end_date)
@@ -1,3 +1,4 @@
+import argparse
 import os
 import sys
 import time
@@ -5,7 +6,10 @@ from pathlib import Path
 
 import pandas as pd
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, inspect, text
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from tenants import DEFAULT_TENANT as DEFAULT_TENANT_ID, database_url, tenant_configs
 
 load_dotenv(Path(__file__).parent.parent / '.env')
 
@@ -19,6 +23,31 @@ DATA_DIR = Path(__file__).parent.parent / 'data_gen' / 'output'
 
 DATABASE_URL = f'postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
 
+DEFAULT_TENANT = tenant_configs()[DEFAULT_TENANT_ID]
+
+DATASETS = [
+    ('accounts.csv', 'raw_accounts'),
+    ('users.csv', 'raw_users'),
+    ('subscriptions.csv', 'raw_subscriptions'),
+    ('invoices.csv', 'raw_invoices'),
+    ('payments.csv', 'raw_payments'),
+    ('crm_deals.csv', 'raw_crm_deals'),
+    ('product_events.csv', 'raw_product_events'),
+    ('support_tickets.csv', 'raw_support_tickets'),
+    ('marketing_spend.csv', 'raw_marketing_spend')
+]
+
+# Business dates that scope incremental data-quality tests (dbt var dq_watermarks);
+# loaded as typed, indexed date columns so the scoped tests don't scan all history
+BUSINESS_DATES = {
+    'raw_invoices': 'invoice_date',
+    'raw_subscriptions': 'start_date',
+}
+
+# stream_ingest.py appends to the event table and records each streamed file here
+STREAM_TABLE = 'raw_product_events'
+STREAM_OFFSETS_TABLE = 'stream_ingest_offsets'
+
 
 def wait_for_db(engine, max_retries=10):
     """Wait for database to be ready."""
@@ -36,55 +65,104 @@ def wait_for_db(engine, max_retries=10):
     return False
 
 
-def load_csv_to_table(engine, csv_path, table_name):
+def tenant_config(tenant_id):
+    """Connection and schema for a tenant in tenants.json; host/port/db default to .env."""
+    configs = tenant_configs()
+    if tenant_id not in configs:
+        raise KeyError(f"Tenant {tenant_id!r} not found in tenants.json")
+    return configs[tenant_id]
+
+
+def load_csv_to_table(engine, csv_path, table_name, tenant=DEFAULT_TENANT):
     """Load CSV data into Postgres table."""
-    print(f"  Loading {csv_path.name} → {table_name}...")
+    print(f"  Loading {csv_path.name} → {tenant['schema']}.{table_name}...")
     
     df = pd.read_csv(csv_path)
+    business_date = BUSINESS_DATES.get(table_name)
+    if business_date:
+        df[business_date] = pd.to_datetime(df[business_date]).dt.date
     
-    df.to_sql(
-        table_name,
-        engine,
-        if_exists='replace',
-        index=False,
-        method='multi'
-    )
+    # One transaction, so the stream ingester never sees the table half replaced
+    with engine.begin() as conn:
+        df.to_sql(
+            table_name,
+            conn,
+            schema=tenant['schema'],
+            if_exists='replace',
+            index=False,
+            method='multi'
+        )
+        
+        # Stamp load time on the server, the same clock stream_ingest.py and the dbt
+        # watermarks use; the index serves incremental reads of streamed rows
+        conn.execute(text(
+            f'ALTER TABLE "{tenant["schema"]}"."{table_name}" '
+            f'ADD COLUMN _loaded_at timestamp NOT NULL DEFAULT now()'
+        ))
+        conn.execute(text(
+            f'CREATE INDEX IF NOT EXISTS "{table_name}__loaded_at" ON "{tenant["schema"]}"."{table_name}" (_loaded_at)'
+        ))
+        if business_date:
+            conn.execute(text(
+                f'CREATE INDEX IF NOT EXISTS "{table_name}__{business_date}" '
+                f'ON "{tenant["schema"]}"."{table_name}" ({business_date})'
+            ))
+        
+        # Replacing the event table drops every streamed event, so forget which
+        # files were ingested and let stream_ingest.py load them again
+        if table_name == STREAM_TABLE and inspect(conn).has_table(STREAM_OFFSETS_TABLE, schema=tenant['schema']):
+            conn.execute(text(f'TRUNCATE "{tenant["schema"]}"."{STREAM_OFFSETS_TABLE}"'))
     
     print(f"    ✓ Loaded {len(df):,} rows")
     return len(df)
 
 
 def main():
+    parser = argparse.ArgumentParser(description='Load generated CSVs into Postgres')
+    parser.add_argument('tables', nargs='*', help='Raw tables to load (default: all)')
+    parser.add_argument('--tenant', default=None,
+                        help='Tenant ID from tenants.json; loads output/tenants/<id>/ into its schema and shard')
+    args = parser.parse_args()
+    
+    known_tables = [table_name for _, table_name in DATASETS]
+    unknown = set(args.tables) - set(known_tables)
+    if unknown:
+        parser.error(f"unknown tables: {', '.join(sorted(unknown))}")
+    
+    if args.tenant:
+        try:
+            tenant = tenant_config(args.tenant)
+        except KeyError as e:
+            parser.error(e.args[0])
+        data_dir = DATA_DIR / 'tenants' / tenant['id']
+        url = database_url(tenant['host'], tenant['port'], tenant['db'])
+    else:
+        tenant, data_dir, url = DEFAULT_TENANT, DATA_DIR, DATABASE_URL
+    
     print("Loading data into Postgres warehouse...")
-    print(f"Connection: {DB_HOST}:{DB_PORT}/{DB_NAME}\n")
+    print(f"Connection: {tenant['host']}:{tenant['port']}/{tenant['db']} (schema {tenant['schema']})\n")
     
-    engine = create_engine(DATABASE_URL)
+    engine = create_engine(url)
     
     if not wait_for_db(engine):
         sys.exit(1)
     
-    datasets = [
-        ('accounts.csv', 'raw_accounts'),
-        ('users.csv', 'raw_users'),
-        ('subscriptions.csv', 'raw_subscriptions'),
-        ('invoices.csv', 'raw_invoices'),
-        ('payments.csv', 'raw_payments'),
-        ('crm_deals.csv', 'raw_crm_deals'),
-        ('product_events.csv', 'raw_product_events'),
-        ('support_tickets.csv', 'raw_support_tickets'),
-        ('marketing_spend.csv', 'raw_marketing_spend')
-    ]
+    with engine.begin() as conn:
+        conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{tenant["schema"]}"'))
+    
+    datasets = [(csv_file, table_name) for csv_file, table_name in DATASETS
+                if not args.tables or table_name in args.tables]
     
     total_rows = 0
     
     for csv_file, table_name in datasets:
-        csv_path = DATA_DIR / csv_file
+        csv_path = data_dir / csv_file
         
         if not csv_path.exists():
             print(f"⚠️  {csv_file} not found, skipping...")
             continue
         
-        rows = load_csv_to_table(engine, csv_path, table_name)
+        rows = load_csv_to_table(engine, csv_path, table_name, tenant)
         total_rows += rows
     
     print(f"\n✅ Data loading complete! Total rows: {total_rows:,}")
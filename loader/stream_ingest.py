@@ -0,0 +1,228 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine
+
+from load_csv_to_postgres import (
+    DATA_DIR, DEFAULT_TENANT, STREAM_OFFSETS_TABLE as OFFSETS_TABLE, STREAM_TABLE as EVENT_TABLE, database_url,
+    tenant_config, wait_for_db,
+)
+
+STREAM_DIR = DATA_DIR / 'stream'
+DBT_DIR = Path(__file__).parent.parent / 'dbt'
+
+EVENT_COLUMNS = ['event_id', 'user_id', 'account_id', 'event_type', 'event_timestamp']
+
+# Only the activation aggregates depend on product events
+REFRESH_MODELS = ['int_user_activity', 'fct_activation']
+
+
+def qualified(schema, table):
+    return f'"{schema}".{table}'
+
+
+def ensure_tables(conn, schema):
+    """Create the event and offset tables in the tenant's schema if this is the first ingestion."""
+    events, offsets = qualified(schema, EVENT_TABLE), qualified(schema, OFFSETS_TABLE)
+    with conn.cursor() as cur:
+        cur.execute(f'CREATE SCHEMA IF NOT EXISTS "{schema}"')
+        cur.execute(f"""
+            CREATE TABLE IF NOT EXISTS {events} (
+                event_id text,
+                user_id text,
+                account_id text,
+                event_type text,
+                event_timestamp text,
+                _loaded_at timestamp DEFAULT now()
+            )
+        """)
+        cur.execute(f"ALTER TABLE {events} ADD COLUMN IF NOT EXISTS _loaded_at timestamp DEFAULT now()")
+        cur.execute(f"CREATE INDEX IF NOT EXISTS {EVENT_TABLE}__loaded_at ON {events} (_loaded_at)")
+        cur.execute(f"""
+            CREATE TABLE IF NOT EXISTS {offsets} (
+                file_name text PRIMARY KEY,
+                row_count bigint NOT NULL,
+                file_bytes bigint NOT NULL,
+                ingested_at timestamp NOT NULL DEFAULT now()
+            )
+        """)
+    conn.commit()
+
+
+def acquire_ingest_lock(conn, schema):
+    """Hold a session advisory lock so only one ingester writes the event table.
+    
+    Rows are stamped with now(), the transaction start. With two ingesters, a
+    batch that started first but committed after an activation refresh would
+    sit below the refresh's loaded_at watermark and never be read.
+    """
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_try_advisory_lock(hashtext(%s))", (f'stream_ingest:{qualified(schema, EVENT_TABLE)}',))
+        acquired = cur.fetchone()[0]
+    conn.commit()
+    return acquired
+
+
+def ingested_files(conn, schema):
+    """Return the names of files already committed to the warehouse.
+    
+    Read on every poll: a batch reload of the event table drops streamed rows
+    and clears the offsets, and those files must then be ingested again.
+    """
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT file_name FROM {qualified(schema, OFFSETS_TABLE)}")
+        names = {row[0] for row in cur.fetchall()}
+    # Don't sit idle in a transaction that would block the loader's TRUNCATE
+    conn.rollback()
+    return names
+
+
+def ingest_batch(conn, schema, paths):
+    """COPY a micro-batch of files and record their offsets in one transaction.
+    
+    The offset row is claimed before the COPY, so a file is either loaded and
+    recorded together or not at all. Rows are copied into a temp table and
+    stamped with now() on insert, since a concurrent batch load may have
+    replaced the event table without a _loaded_at default.
+    """
+    loaded = {}
+    events, offsets = qualified(schema, EVENT_TABLE), qualified(schema, OFFSETS_TABLE)
+    columns = ', '.join(EVENT_COLUMNS)
+    copy_sql = f"COPY stream_batch ({columns}) FROM STDIN WITH (FORMAT csv, HEADER true)"
+    
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"CREATE TEMP TABLE stream_batch ON COMMIT DROP AS SELECT {columns} FROM {events} WITH NO DATA")
+            for path in paths:
+                cur.execute(
+                    f"INSERT INTO {offsets} (file_name, row_count, file_bytes) VALUES (%s, 0, %s) "
+                    f"ON CONFLICT (file_name) DO NOTHING RETURNING file_name",
+                    (path.name, path.stat().st_size)
+                )
+                if cur.fetchone() is None:
+                    continue
+                
+                with open(path) as f:
+                    cur.copy_expert(copy_sql, f)
+                cur.execute(
+                    f"INSERT INTO {events} ({columns}, _loaded_at) SELECT {columns}, now() FROM stream_batch"
+                )
+                rows = cur.rowcount
+                cur.execute("TRUNCATE stream_batch")
+                
+                cur.execute(f"UPDATE {offsets} SET row_count = %s WHERE file_name = %s", (rows, path.name))
+                loaded[path.name] = rows
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    
+    return loaded
+
+
+def refresh_activation(tenant):
+    """Rebuild only the incremental activation models downstream of product events, in the tenant's warehouse."""
+    env = {
+        **os.environ,
+        'POSTGRES_HOST': tenant['host'],
+        'POSTGRES_PORT': tenant['port'],
+        'POSTGRES_DB': tenant['db'],
+        'DBT_SCHEMA': tenant['schema'],
+    }
+    # Own artifact paths, so a refresh never clobbers a tenant build running alongside it
+    dbt_paths = ['--target-path', f"target/stream/{tenant['id']}", '--log-path', f"logs/stream/{tenant['id']}"]
+    result = subprocess.run(['dbt', 'run', '--select', *REFRESH_MODELS, *dbt_paths], cwd=DBT_DIR, env=env)
+    return result.returncode == 0
+
+
+def run(tenant, stream_dir, poll_seconds, max_files, refresh_seconds, archive):
+    schema = tenant['schema']
+    print("Streaming product events into Postgres warehouse...")
+    print(f"Connection: {tenant['host']}:{tenant['port']}/{tenant['db']} (schema {schema})")
+    print(f"Watching: {stream_dir}\n")
+    
+    engine = create_engine(database_url(tenant['host'], tenant['port'], tenant['db']))
+    if not wait_for_db(engine):
+        sys.exit(1)
+    
+    conn = engine.raw_connection()
+    if not acquire_ingest_lock(conn, schema):
+        print("❌ Another stream ingester is already running against this warehouse")
+        sys.exit(1)
+    ensure_tables(conn, schema)
+    archive_dir = stream_dir / 'ingested'
+    
+    pending_rows = 0
+    last_refresh = time.monotonic()
+    
+    while True:
+        seen = ingested_files(conn, schema)
+        # Archived files are only pending again after a batch reload cleared their offsets
+        files = sorted([*stream_dir.glob('*.csv'), *archive_dir.glob('*.csv')], key=lambda p: p.name)
+        pending = [p for p in files if p.name not in seen]
+        
+        if pending:
+            batch = pending[:max_files]
+            start = time.monotonic()
+            loaded = ingest_batch(conn, schema, batch)
+            
+            batch_rows = sum(loaded.values())
+            pending_rows += batch_rows
+            print(f"  ✓ {len(loaded)} files, {batch_rows:,} events in {time.monotonic() - start:.2f}s")
+            
+            if archive:
+                archive_dir.mkdir(exist_ok=True)
+                for path in batch:
+                    if path.parent != archive_dir:
+                        path.rename(archive_dir / path.name)
+        
+        if pending_rows and time.monotonic() - last_refresh >= refresh_seconds:
+            print(f"  ↻ Refreshing activation models ({pending_rows:,} new events)...")
+            if refresh_activation(tenant):
+                pending_rows = 0
+            last_refresh = time.monotonic()
+        
+        if len(pending) <= max_files:
+            time.sleep(poll_seconds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-batch product event files into raw_product_events')
+    parser.add_argument('--tenant', default=None,
+                        help='Tenant ID from tenants.json; ingests into its schema and shard')
+    parser.add_argument('--stream-dir', type=Path, default=None,
+                        help='Directory to tail for completed event files '
+                             '(default: output/stream/, or output/tenants/<id>/stream/ with --tenant)')
+    parser.add_argument('--poll-seconds', type=float, default=2,
+                        help='Seconds between directory scans when idle')
+    parser.add_argument('--max-files', type=int, default=20,
+                        help='Maximum files per micro-batch transaction')
+    parser.add_argument('--refresh-seconds', type=float, default=60,
+                        help='Minimum seconds between activation model refreshes')
+    parser.add_argument('--archive', action='store_true',
+                        help='Move ingested files into an ingested/ subdirectory')
+    args = parser.parse_args()
+    
+    if args.tenant:
+        try:
+            tenant = tenant_config(args.tenant)
+        except KeyError as e:
+            parser.error(e.args[0])
+        stream_dir = args.stream_dir or DATA_DIR / 'tenants' / tenant['id'] / 'stream'
+    else:
+        tenant, stream_dir = DEFAULT_TENANT, args.stream_dir or STREAM_DIR
+    
+    stream_dir.mkdir(parents=True, exist_ok=True)
+    
+    try:
+        run(tenant, stream_dir, args.poll_seconds, args.max_files, args.refresh_seconds, args.archive)
+    except KeyboardInterrupt:
+        print("\nIngestion stopped.")
+
+
+if __name__ == '__main__':
+    main()
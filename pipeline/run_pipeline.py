@@ -0,0 +1,411 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import SQLAlchemyError
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / 'loader'))
+from load_csv_to_postgres import DATABASE_URL, DATASETS
+
+STATE_DIR = ROOT / '.pipeline'
+STATE_PATH = STATE_DIR / 'state.json'
+TRACE_PATH = STATE_DIR / 'trace.json'
+
+DATA_DIR = ROOT / 'data_gen' / 'output'
+DBT_DIR = ROOT / 'dbt'
+
+# Environment that changes what the generator, loader and dbt produce
+PARAM_ENV_VARS = ['DATA_START_DATE', 'DATA_END_DATE', 'POSTGRES_HOST', 'POSTGRES_PORT', 'POSTGRES_DB', 'DBT_SCHEMA']
+
+REF_PATTERN = re.compile(r"""ref\(\s*['"](\w+)['"]\s*\)""")
+SOURCE_PATTERN = re.compile(r"""source\(\s*['"]\w+['"]\s*,\s*['"](\w+)['"]\s*\)""")
+INCREMENTAL_PATTERN = re.compile(r"""materialized\s*=\s*['"]incremental['"]""")
+
+
+class Step:
+    """A pipeline stage whose work is skipped when its input key is unchanged."""
+
+    def __init__(self, name, command=None, cwd=ROOT, inputs=(), deps=(), outputs=(), always=False):
+        self.name = name
+        self.command = command
+        self.cwd = cwd
+        self.inputs = list(inputs)
+        self.deps = list(deps)
+        self.outputs = list(outputs)
+        self.always = always
+
+    def key(self, runner):
+        digest = hashlib.sha256(self.name.encode())
+        digest.update(json.dumps(self.command).encode())
+        for path in self.inputs:
+            digest.update(str(path.relative_to(ROOT)).encode())
+            digest.update(runner.fingerprint(path).encode())
+        for dep in self.deps:
+            digest.update(runner.keys[dep].encode())
+        return runner.params_key(digest)
+
+    def is_fresh(self, runner, key):
+        if self.always or runner.force:
+            return False
+        if any(not path.exists() for path in self.outputs):
+            return False
+        return runner.state['steps'].get(self.name) == key
+
+    def execute(self, runner, key):
+        return run_command(self.command, self.cwd)
+
+    def record(self, runner, key):
+        runner.state['steps'][self.name] = key
+
+    def resolve_key(self, runner, key):
+        """Key dependents see once the step has run."""
+        return key
+
+
+def database_identity():
+    """Cluster system identifier and database oid; both change when the volume or database is recreated."""
+    engine = create_engine(DATABASE_URL)
+    try:
+        with engine.connect() as conn:
+            row = conn.execute(text(
+                "SELECT (SELECT system_identifier FROM pg_control_system()), oid "
+                "FROM pg_database WHERE datname = current_database()"
+            )).one()
+        return f'{row[0]}:{row[1]}'
+    except SQLAlchemyError:
+        return None
+    finally:
+        engine.dispose()
+
+
+class UpStep(Step):
+    """Starts Postgres and keys dependents on the database's identity, so a fresh volume reloads everything."""
+
+    def __init__(self, name, command, inputs):
+        super().__init__(name, command, inputs=inputs, always=True)
+        self.database_id = None
+
+    def execute(self, runner, key):
+        returncode, output = super().execute(runner, key)
+        if returncode == 0:
+            self.database_id = database_identity()
+            if self.database_id is None:
+                return 1, output + f"\nCould not read the database identity from {DATABASE_URL.split('@')[-1]}"
+        return returncode, output
+
+    def resolve_key(self, runner, key):
+        return hashlib.sha256(f'{key}:{self.database_id}'.encode()).hexdigest()
+
+
+class DbtRunStep(Step):
+    """Runs only the dbt models whose SQL or upstream inputs changed.
+
+    Incremental models only recompute their newest rows, so one whose own SQL or
+    upstream loads changed (loads are full replaces) is rebuilt with --full-refresh,
+    along with every changed model downstream of it.
+    """
+
+    def __init__(self, name, deps):
+        super().__init__(name, cwd=DBT_DIR, deps=deps)
+        self.model_keys = {}
+        self.refresh_keys = {}
+        self.model_refs = {}
+        self.incremental = set()
+
+    def _model_paths(self):
+        return {path.stem: path for path in sorted((DBT_DIR / 'models').rglob('*.sql'))}
+
+    def _project_files(self):
+        files = [DBT_DIR / 'dbt_project.yml', DBT_DIR / 'profiles.yml']
+        files += sorted((DBT_DIR / 'macros').rglob('*.sql'))
+        files += sorted((DBT_DIR / 'models').rglob('*.yml'))
+        return [path for path in files if path.exists()]
+
+    def _compute_model_keys(self, runner):
+        paths = self._model_paths()
+        snapshots = {path.stem for path in (DBT_DIR / 'snapshots').rglob('*.sql')}
+        project_digest = hashlib.sha256()
+        for path in self._project_files():
+            project_digest.update(runner.fingerprint(path).encode())
+        project_digest.update(runner.keys.get('dbt-deps', '').encode())
+        project_key = runner.params_key(project_digest)
+
+        sql = {name: path.read_text() for name, path in paths.items()}
+        self.model_refs = {name: sorted(set(REF_PATTERN.findall(sql[name])) & set(paths)) for name in paths}
+        self.incremental = {name for name in paths if INCREMENTAL_PATTERN.search(sql[name])}
+        keys = {}
+        sources = {}
+
+        def model_key(name, visiting=()):
+            if name in keys:
+                return keys[name]
+            if name in visiting:
+                raise ValueError(f"Cycle in dbt refs at {name}")
+            digest = hashlib.sha256(project_key.encode())
+            digest.update(runner.fingerprint(paths[name]).encode())
+            sources[name] = set(SOURCE_PATTERN.findall(sql[name]))
+            for ref in sorted(set(REF_PATTERN.findall(sql[name]))):
+                if ref in paths:
+                    digest.update(model_key(ref, visiting + (name,)).encode())
+                    sources[name] |= sources[ref]
+                elif ref in snapshots:
+                    digest.update(runner.keys.get('dbt-snapshot', '').encode())
+            for table in sorted(set(SOURCE_PATTERN.findall(sql[name]))):
+                digest.update(runner.keys.get(f'load:{table}', '').encode())
+            keys[name] = digest.hexdigest()
+            return keys[name]
+
+        for name in paths:
+            model_key(name)
+
+        # What an incremental model's existing rows were built from: its own SQL and every upstream load
+        self.refresh_keys = {}
+        for name in sorted(self.incremental):
+            digest = hashlib.sha256(runner.fingerprint(paths[name]).encode())
+            for table in sorted(sources[name]):
+                digest.update(f"{table}={runner.keys.get(f'load:{table}', '')}".encode())
+            self.refresh_keys[name] = digest.hexdigest()
+        return keys
+
+    def key(self, runner):
+        self.model_keys = self._compute_model_keys(runner)
+        return hashlib.sha256(json.dumps(self.model_keys, sort_keys=True).encode()).hexdigest()
+
+    def _changed_models(self, runner):
+        if runner.force:
+            return sorted(self.model_keys)
+        previous = runner.state['models']
+        return sorted(name for name, key in self.model_keys.items() if previous.get(name) != key)
+
+    def _full_refresh_models(self, runner, changed):
+        """Changed models that must be rebuilt from scratch: stale incremental models and everything below them."""
+        previous = runner.state['refresh']
+        stale = {name for name, key in self.refresh_keys.items() if previous.get(name) != key}
+        refresh = set()
+
+        def below_stale(name):
+            return name in stale or any(below_stale(ref) for ref in self.model_refs[name])
+
+        for name in changed:
+            if below_stale(name):
+                refresh.add(name)
+        return sorted(refresh)
+
+    def _select(self, models):
+        return [] if len(models) == len(self.model_keys) else ['--select', *models]
+
+    def execute(self, runner, key):
+        changed = self._changed_models(runner)
+        refresh = self._full_refresh_models(runner, changed)
+        rest = [name for name in changed if name not in refresh]
+        if len(changed) < len(self.model_keys):
+            print(f"  [{self.name}] {len(changed)} changed models: {', '.join(changed)}")
+        if refresh:
+            print(f"  [{self.name}] full refresh: {', '.join(refresh)}")
+
+        # Nothing in `rest` sits below a refreshed model, so it can safely go first
+        commands = []
+        if rest:
+            commands.append(['dbt', 'run', *self._select(rest)])
+        if refresh:
+            commands.append(['dbt', 'run', '--full-refresh', *self._select(refresh)])
+
+        outputs = []
+        for command in commands:
+            returncode, output = run_command(command, self.cwd)
+            outputs.append(output)
+            if returncode != 0:
+                return returncode, '\n'.join(outputs)
+        return 0, '\n'.join(outputs)
+
+    def record(self, runner, key):
+        super().record(runner, key)
+        runner.state['models'] = dict(self.model_keys)
+        runner.state['refresh'] = dict(self.refresh_keys)
+
+
+def run_command(command, cwd, env=None):
+    result = subprocess.run(command, cwd=cwd, env=env, capture_output=True, text=True)
+    return result.returncode, result.stdout + result.stderr
+
+
+def build_steps():
+    """Model the Makefile chain and per-table loads as a DAG."""
+    steps = [
+        UpStep('up', ['docker', 'compose', 'up', '-d', '--wait'], inputs=[ROOT / 'docker-compose.yml']),
+        Step('gen-data', [sys.executable, 'generator.py'], cwd=ROOT / 'data_gen',
+             inputs=[ROOT / 'data_gen' / 'generator.py'],
+             outputs=[DATA_DIR / csv_file for csv_file, _ in DATASETS]),
+    ]
+
+    for csv_file, table_name in DATASETS:
+        steps.append(Step(
+            f'load:{table_name}', [sys.executable, 'load_csv_to_postgres.py', table_name],
+            cwd=ROOT / 'loader',
+            inputs=[DATA_DIR / csv_file, ROOT / 'loader' / 'load_csv_to_postgres.py'],
+            deps=['up', 'gen-data'],
+        ))
+
+    packages = [path for path in [DBT_DIR / 'packages.yml'] if path.exists()]
+    steps.append(Step('dbt-deps', ['dbt', 'deps'], cwd=DBT_DIR, inputs=packages))
+
+    # Snapshots read the raw tables directly, so they only wait on the loads they track
+    snapshots = sorted((DBT_DIR / 'snapshots').rglob('*.sql'))
+    steps.append(Step('dbt-snapshot', ['dbt', 'snapshot'], cwd=DBT_DIR, inputs=snapshots,
+                      deps=['dbt-deps', 'load:raw_accounts', 'load:raw_subscriptions']))
+
+    load_steps = [f'load:{table_name}' for _, table_name in DATASETS]
+    steps.append(DbtRunStep('dbt-run', deps=['dbt-deps', 'dbt-snapshot', *load_steps]))
+
+    tests = sorted((DBT_DIR / 'tests').rglob('*.sql'))
+    steps.append(Step('dbt-test', ['dbt', 'test'], cwd=DBT_DIR, inputs=tests, deps=['dbt-run']))
+
+    app_modules = [ROOT / 'app' / name for name in
+                   ['render_snapshots.py', 'snapshots.py', 'figures.py', 'queries.py', 'forecast.py', 'account_bitmaps.py']]
+    steps.append(Step('snapshots', [sys.executable, 'render_snapshots.py', '--force'], cwd=ROOT / 'app',
+                      inputs=app_modules, deps=['dbt-run'], outputs=[ROOT / 'app' / 'snapshots']))
+    return steps
+
+
+class PipelineRunner:
+    def __init__(self, steps, jobs, force):
+        self.steps = {step.name: step for step in steps}
+        self.jobs = jobs
+        self.force = force
+        self.keys = {}
+        self.trace = []
+        self.lock = threading.Lock()
+        self.state = self._load_state()
+        self.start = time.monotonic()
+
+    def _load_state(self):
+        if STATE_PATH.exists():
+            state = json.loads(STATE_PATH.read_text())
+        else:
+            state = {}
+        for section in ('steps', 'models', 'refresh', 'files'):
+            state.setdefault(section, {})
+        return state
+
+    def _save_state(self):
+        STATE_DIR.mkdir(exist_ok=True)
+        STATE_PATH.write_text(json.dumps(self.state, indent=2, sort_keys=True))
+
+    def params_key(self, digest):
+        """Fold .env and parameter environment variables into a step key."""
+        digest.update(self.fingerprint(ROOT / '.env').encode())
+        for var in PARAM_ENV_VARS:
+            digest.update(f'{var}={os.getenv(var, "")}'.encode())
+        return digest.hexdigest()
+
+    def fingerprint(self, path):
+        """Content hash of a file, reusing the cached hash while size and mtime match."""
+        if not path.exists():
+            return 'missing'
+        stat = path.stat()
+        stamp = f'{stat.st_size}:{stat.st_mtime_ns}'
+        cache_key = str(path.relative_to(ROOT))
+        with self.lock:
+            cached = self.state['files'].get(cache_key)
+        if cached and cached['stamp'] == stamp:
+            return cached['sha256']
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        with self.lock:
+            self.state['files'][cache_key] = {'stamp': stamp, 'sha256': digest.hexdigest()}
+        return digest.hexdigest()
+
+    def _run_step(self, step):
+        started = time.monotonic()
+        key = step.key(self)
+        if step.is_fresh(self, key):
+            status, output = 'skipped', ''
+        else:
+            returncode, output = step.execute(self, key)
+            status = 'ran' if returncode == 0 else 'failed'
+            if status == 'ran':
+                key = step.resolve_key(self, key)
+        finished = time.monotonic()
+
+        with self.lock:
+            self.keys[step.name] = key
+            if status == 'ran':
+                step.record(self, key)
+                self._save_state()
+            self.trace.append({
+                'name': step.name,
+                'ph': 'X',
+                'pid': 0,
+                'tid': threading.get_ident(),
+                'ts': round((started - self.start) * 1e6),
+                'dur': round((finished - started) * 1e6),
+                'args': {'status': status},
+            })
+        return status, finished - started, output
+
+    def run(self):
+        pending = dict(self.steps)
+        done = set()
+        failed = False
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            while pending or running:
+                if not failed:
+                    ready = [name for name, step in pending.items() if all(dep in done for dep in step.deps)]
+                    for name in ready:
+                        running[pool.submit(self._run_step, pending.pop(name))] = name
+
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    status, seconds, output = future.result()
+                    icon = {'ran': '✓', 'skipped': '↷', 'failed': '❌'}[status]
+                    print(f"  {icon} {name:<28} {status:<8} {seconds:7.2f}s")
+                    if status == 'failed':
+                        print(output)
+                        failed = True
+                    else:
+                        done.add(name)
+
+        STATE_DIR.mkdir(exist_ok=True)
+        TRACE_PATH.write_text(json.dumps({'traceEvents': self.trace}, indent=2))
+        return not failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the pipeline, skipping steps whose inputs are unchanged')
+    parser.add_argument('--jobs', type=int, default=4, help='Maximum steps to run concurrently')
+    parser.add_argument('--force', action='store_true', help='Rerun every step regardless of cached keys')
+    args = parser.parse_args()
+
+    print("Running SaaS GTM pipeline...\n")
+    runner = PipelineRunner(build_steps(), args.jobs, args.force)
+    ok = runner.run()
+
+    elapsed = time.monotonic() - runner.start
+    print(f"\nTiming trace: {TRACE_PATH.relative_to(ROOT)} (open in chrome://tracing or Perfetto)")
+    if not ok:
+        print(f"❌ Pipeline failed after {elapsed:.1f}s")
+        sys.exit(1)
+    print(f"✅ Pipeline complete in {elapsed:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
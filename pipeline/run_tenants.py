@@ -0,0 +1,167 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from tenants import DEFAULT_TENANT, tenant_configs
+
+from run_pipeline import DATA_DIR, DBT_DIR, ROOT, STATE_DIR, run_command
+
+TENANT_TRACE_PATH = STATE_DIR / 'tenants_trace.json'
+TENANT_LOG_DIR = STATE_DIR / 'tenants'
+
+
+def load_tenants():
+    """Tenants listed in tenants.json, with connection defaults filled in from the environment."""
+    return [config for tenant_id, config in tenant_configs().items() if tenant_id != DEFAULT_TENANT]
+
+
+def shard_of(tenant):
+    return tenant['host'], tenant['port'], tenant['db']
+
+
+def tenant_env(tenant):
+    """Point the loader and dbt at the tenant's shard and schema."""
+    return {
+        **os.environ,
+        'POSTGRES_HOST': tenant['host'],
+        'POSTGRES_PORT': tenant['port'],
+        'POSTGRES_DB': tenant['db'],
+        'DBT_SCHEMA': tenant['schema'],
+    }
+
+
+def tenant_stages(tenant, args):
+    """(name, command, cwd) for each stage of one tenant's build, in order."""
+    tenant_id = tenant['id']
+    # Separate target/log paths so concurrent dbt invocations don't clobber each other's artifacts
+    dbt_paths = ['--target-path', f'target/tenants/{tenant_id}', '--log-path', f'logs/tenants/{tenant_id}']
+
+    stages = []
+    regenerate = args.regenerate or not (DATA_DIR / 'tenants' / tenant_id / 'accounts.csv').exists()
+    if regenerate:
+        stages.append(('gen-data', [sys.executable, 'generator.py', '--tenant', tenant_id], ROOT / 'data_gen'))
+    # New data is a full replace, so incremental marts must not keep the previous data's history
+    full_refresh = ['--full-refresh'] if regenerate else []
+    stages += [
+        ('load', [sys.executable, 'load_csv_to_postgres.py', '--tenant', tenant_id], ROOT / 'loader'),
+        ('dbt-snapshot', ['dbt', 'snapshot', '--threads', str(args.threads), *dbt_paths], DBT_DIR),
+        ('dbt-run', ['dbt', 'run', '--threads', str(args.threads), *full_refresh, *dbt_paths], DBT_DIR),
+        ('dbt-test', ['dbt', 'test', '--threads', str(args.threads), *dbt_paths], DBT_DIR),
+    ]
+    if not args.skip_snapshots:
+        stages.append(('snapshots', [sys.executable, 'render_snapshots.py', '--tenant', tenant_id,
+                                     '--workers', str(args.threads)], ROOT / 'app'))
+    return stages
+
+
+class TenantBuilder:
+    """Builds many tenants at once, bounded overall and per Postgres shard."""
+
+    def __init__(self, tenants, args):
+        self.tenants = tenants
+        self.args = args
+        self.start = time.monotonic()
+        self.trace = []
+        self.lock = threading.Lock()
+        self.shards = sorted({shard_of(tenant) for tenant in tenants})
+        self.job_slots = threading.Semaphore(args.jobs)
+
+    def build(self, tenant, tid):
+        shard = shard_of(tenant)
+        log_path = TENANT_LOG_DIR / f"{tenant['id']}.log"
+        env = tenant_env(tenant)
+
+        with self.job_slots, open(log_path, 'w') as log:
+            for stage, command, cwd in tenant_stages(tenant, self.args):
+                started = time.monotonic()
+                returncode, output = run_command(command, cwd, env)
+                finished = time.monotonic()
+                log.write(f"$ {' '.join(command)}\n{output}\n")
+
+                status = 'ran' if returncode == 0 else 'failed'
+                with self.lock:
+                    self.trace.append({
+                        'name': f"{tenant['id']}:{stage}",
+                        'ph': 'X',
+                        'pid': self.shards.index(shard),
+                        'tid': tid,
+                        'ts': round((started - self.start) * 1e6),
+                        'dur': round((finished - started) * 1e6),
+                        'args': {'status': status},
+                    })
+                    icon = '✓' if status == 'ran' else '❌'
+                    print(f"  {icon} {tenant['id']:<16} {stage:<12} {finished - started:7.2f}s")
+                if status == 'failed':
+                    return False, output
+        return True, ''
+
+    def run(self):
+        TENANT_LOG_DIR.mkdir(parents=True, exist_ok=True)
+        failed = []
+        # One queue per shard, so tenants waiting on a busy shard never hold slots an idle shard could use
+        pools = {shard: ThreadPoolExecutor(max_workers=self.args.per_shard) for shard in self.shards}
+        try:
+            futures = {
+                pools[shard_of(tenant)].submit(self.build, tenant, tid): tenant['id']
+                for tid, tenant in enumerate(self.tenants)
+            }
+            for future in as_completed(futures):
+                ok, output = future.result()
+                if not ok:
+                    failed.append(futures[future])
+                    print(output[-2000:])
+        finally:
+            for pool in pools.values():
+                pool.shutdown()
+
+        # One trace process per shard, one thread per tenant
+        names = [
+            {'name': 'process_name', 'ph': 'M', 'pid': pid, 'args': {'name': f'{host}:{port}/{db}'}}
+            for pid, (host, port, db) in enumerate(self.shards)
+        ]
+        TENANT_TRACE_PATH.write_text(json.dumps({'traceEvents': names + self.trace}, indent=2))
+        return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build every tenant warehouse with bounded concurrency')
+    parser.add_argument('--tenants', nargs='*', help='Tenant IDs to build (default: all in tenants.json)')
+    parser.add_argument('--jobs', type=int, default=4, help='Maximum tenants building at once')
+    parser.add_argument('--per-shard', type=int, default=2, help='Maximum concurrent tenant builds per Postgres instance')
+    parser.add_argument('--threads', type=int, default=2, help='dbt threads and snapshot workers per tenant')
+    parser.add_argument('--regenerate', action='store_true', help='Regenerate tenant CSVs even if they exist')
+    parser.add_argument('--skip-snapshots', action='store_true', help='Do not pre-render dashboard snapshots')
+    args = parser.parse_args()
+
+    tenants = load_tenants()
+    if args.tenants:
+        unknown = set(args.tenants) - {tenant['id'] for tenant in tenants}
+        if unknown:
+            parser.error(f"unknown tenants: {', '.join(sorted(unknown))}")
+        tenants = [tenant for tenant in tenants if tenant['id'] in args.tenants]
+
+    print(f"Building {len(tenants)} tenants ({args.jobs} at once, {args.per_shard} per shard)...\n")
+    returncode, output = run_command(['dbt', 'deps'], DBT_DIR)
+    if returncode != 0:
+        print(output)
+        sys.exit(1)
+
+    builder = TenantBuilder(tenants, args)
+    failed = builder.run()
+
+    elapsed = time.monotonic() - builder.start
+    print(f"\nLogs: {TENANT_LOG_DIR.relative_to(ROOT)}/  Timing trace: {TENANT_TRACE_PATH.relative_to(ROOT)}")
+    if failed:
+        print(f"❌ {len(failed)} tenant builds failed after {elapsed:.1f}s: {', '.join(sorted(failed))}")
+        sys.exit(1)
+    print(f"✅ {len(tenants)} tenants built in {elapsed:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""Tenant registry shared by the loader, pipeline runners, dashboard, metrics API and snapshot renderer.
+
+Each tenant's warehouse lives in its own schema (<schema>_marts for marts) on
+one of possibly several Postgres instances. tenants.json lists tenants with
+optional host/port/db overrides; the 'default' tenant is the .env warehouse
+in the public schema.
+"""
+import json
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv(Path(__file__).parent / '.env')
+
+DB_HOST = os.getenv('POSTGRES_HOST', 'localhost')
+DB_PORT = os.getenv('POSTGRES_PORT', '5432')
+DB_NAME = os.getenv('POSTGRES_DB', 'saas_analytics')
+DB_USER = os.getenv('POSTGRES_USER', 'analytics_user')
+DB_PASSWORD = os.getenv('POSTGRES_PASSWORD', 'analytics_pass')
+
+TENANTS_PATH = Path(__file__).parent / 'tenants.json'
+DEFAULT_TENANT = 'default'
+
+
+def database_url(host=DB_HOST, port=DB_PORT, db=DB_NAME):
+    return f'postgresql://{DB_USER}:{DB_PASSWORD}@{host}:{port}/{db}'
+
+
+def tenant_configs():
+    """Map tenant id to its id, schema, host, port and db, with connection defaults from .env.
+
+    This is the only parser of tenants.json.
+    """
+    configs = {DEFAULT_TENANT: {'id': DEFAULT_TENANT, 'schema': 'public', 'host': DB_HOST, 'port': DB_PORT, 'db': DB_NAME}}
+    if TENANTS_PATH.exists():
+        for tenant in json.loads(TENANTS_PATH.read_text())['tenants']:
+            configs[tenant['id']] = {
+                'id': tenant['id'],
+                'schema': tenant.get('schema', tenant['id']),
+                'host': str(tenant.get('host', DB_HOST)),
+                'port': str(tenant.get('port', DB_PORT)),
+                'db': tenant.get('db', DB_NAME),
+            }
+    return configs
+
+
+def load_tenants():
+    """Map tenant id to its database URL and warehouse schema."""
+    return {
+        tenant_id: {'database_url': database_url(config['host'], config['port'], config['db']), 'schema': config['schema']}
+        for tenant_id, config in tenant_configs().items()
+    }